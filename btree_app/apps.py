@@ -1,6 +1,18 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
 class BtreedbConfig(AppConfig):
     default_auto_field = 'django.btree_app.models.BigAutoField'
     name = 'btree_app'
+
+    def ready(self):
+        if os.path.basename(sys.argv[0]) in ('manage.py', 'django-admin'):
+            if sys.argv[1:2] != ['runserver']:
+                return
+            if os.environ.get('RUN_MAIN') != 'true' and '--noreload' not in sys.argv:
+                return
+        from btree_db import db_operations
+        db_operations.connect()
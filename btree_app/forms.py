@@ -1,5 +1,4 @@
-from django.forms import Form, IntegerField, CharField, Textarea, NumberInput, ValidationError
-from btree_db.db_operations import init_db
+from django.forms import Form, IntegerField, CharField, Textarea, NumberInput
 
 
 class KeyValueForm(Form):
@@ -8,48 +7,27 @@ class KeyValueForm(Form):
 
 
 class KeyForm(Form):
-    key = IntegerField(label='', min_value=0, widget=NumberInput({'placeholder': 'Key'}))
-
-
-class KeyExistsForm(Form):
-
-    def clean_key(self):
-        key = int(self.cleaned_data['key'])
-        btree = init_db(False)
-        with btree.open('r'):
-            try:
-                btree[key]
-            except KeyError:
-                return key
-            else:
-                raise ValidationError('Key already exists')
-
+    key = IntegerField(label='', min_value=0, max_value=2 ** 32 - 1, widget=NumberInput({'placeholder': 'Key'}))
 
-class KeyDoesntExistForm(Form):
 
-    def clean_key(self):
-        key = int(self.cleaned_data['key'])
-        btree = init_db(False)
-        with btree.open('r'):
-            try:
-                btree[key]
-            except KeyError:
-                raise ValidationError("Key doesn't exists")
-            else:
-                return key
+class PageForm(Form):
+    after = IntegerField(required=False, min_value=0, max_value=2 ** 32 - 1)
+    before = IntegerField(required=False, min_value=0, max_value=2 ** 32 - 1)
+    limit = IntegerField(required=False, min_value=1, max_value=1000)
+    page = IntegerField(required=False, min_value=1)
 
 
-class InsertForm(KeyValueForm, KeyExistsForm):
+class InsertForm(KeyValueForm):
     pass
 
 
-class UpdateForm(KeyValueForm, KeyDoesntExistForm):
+class UpdateForm(KeyValueForm):
     pass
 
 
-class DeleteForm(KeyForm, KeyDoesntExistForm):
+class DeleteForm(KeyForm):
     pass
 
 
-class ReadForm(KeyForm, KeyDoesntExistForm):
+class ReadForm(KeyForm):
     pass
@@ -0,0 +1,45 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from btree_db import benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the btree_db engine on scratch databases and print the results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, nargs='+', default=[1000, 10000, 100000], help='Key counts to run')
+        parser.add_argument('--t', type=int, nargs='+', default=[50], help='Minimum degrees to run')
+        parser.add_argument(
+            '--workloads', nargs='+', choices=benchmark.WORKLOADS, default=list(benchmark.WORKLOADS),
+            help='Workloads to run, in order'
+        )
+        parser.add_argument('--operations', type=int, default=100000, help='Operations per read/update/mixed run')
+        parser.add_argument('--value-size', type=int, default=32, help='Length of each stored value')
+        parser.add_argument('--read-ratio', type=float, default=0.9, help='Fraction of reads in the mixed workload')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--engine', choices=['btree', 'bplus'], default='btree', help='Index engine')
+        parser.add_argument('--wal', action='store_true', help='Enable the write-ahead log')
+        parser.add_argument('--shadow', action='store_true', help='Use shadow-paged index files')
+        parser.add_argument('--compression', action='store_true', help='Compress stored values')
+        parser.add_argument('--value-cache', type=int, default=0, help='Byte budget of the decoded value cache')
+        parser.add_argument('--directory', help='Directory for the scratch databases')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        try:
+            report = benchmark.run(
+                options['keys'], options['t'], options['workloads'], options['operations'],
+                options['value_size'], options['read_ratio'], options['seed'], options['directory'],
+                self.stderr.write if options['verbosity'] > 1 else None,
+                engine=options['engine'], wal=options['wal'], shadow=options['shadow'],
+                compression=options['compression'], value_cache=options['value_cache']
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['results'])} results to {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,41 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from btree_db import db_operations
+
+
+class Command(BaseCommand):
+    help = 'Load (key, value) records from a CSV or JSON lines file, building the index bottom-up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file with one record per line')
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'], help='Input format, guessed from the extension by default'
+        )
+        parser.add_argument('--presorted', action='store_true', help='Input is already sorted by key')
+        parser.add_argument('--fill-factor', type=float, default=1.0, help='Fraction of each node to fill')
+        parser.add_argument('--truncate', action='store_true', help='Delete all existing records first')
+
+    def _records(self, f, file_format):
+        if file_format == 'csv':
+            for row in csv.reader(f):
+                if row:
+                    yield int(row[0]), row[1]
+        else:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield int(record['key']), str(record['value'])
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.json')) else 'csv')
+        if options['truncate']:
+            db_operations.delete_all()
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                count = db_operations.bulk_load(
+                    self._records(f, file_format), options['presorted'], options['fill_factor']
+                )
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(f'Loaded {count} records'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from btree_db import db_operations
+from btree_db.index_migration import migrate_index_dir
+
+
+class Command(BaseCommand):
+    help = "Convert a legacy '<name>_index/' directory of pickled nodes into a single paged index file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', default=db_operations.name, help='Database name')
+        parser.add_argument('--remove', action='store_true', help='Remove the legacy directory afterwards')
+        parser.add_argument('--force', action='store_true', help='Overwrite an existing index and superblock')
+
+    def handle(self, *args, **options):
+        try:
+            count = migrate_index_dir(options['name'], options['remove'], options['force'])
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(f"Migrated {count} nodes into {options['name']}.bindex"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from btree_db import db_operations
+
+
+class Command(BaseCommand):
+    help = 'Train a shared compression dictionary from a sample of the stored values'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=1000, help='Number of stored values to sample')
+
+    def handle(self, *args, **options):
+        try:
+            size = db_operations.train_dictionary(options['samples'])
+        except ValueError as e:
+            raise CommandError(e)
+        if not size:
+            raise CommandError('The sampled values share no content to build a dictionary from')
+        self.stdout.write(self.style.SUCCESS(f'Trained a {size} byte compression dictionary'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from btree_db import db_operations
+
+
+class Command(BaseCommand):
+    help = 'Rewrite the live records of the value file in key order and rebuild the index over them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fill-factor', type=float, default=1.0, help='Fraction of each node to fill')
+
+    def handle(self, *args, **options):
+        btree = db_operations.connect()
+        live_size, dead_size = btree.live_size, btree.dead_size
+        try:
+            reclaimed = db_operations.vacuum(options['fill_factor'])
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            f'Reclaimed {reclaimed} bytes ({dead_size} dead, {live_size} live before vacuum)'
+        ))
@@ -1 +1,208 @@
+import json
+import os
+import tempfile
+from io import StringIO
 
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from btree_db import db_operations
+from . import views
+
+
+class DatabaseTestCase(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(setattr, db_operations, 'name', db_operations.name)
+        db_operations.name = os.path.join(directory.name, 'db')
+        self.addCleanup(db_operations.disconnect)
+        db_operations.connect(truncate=True)
+
+
+class BatchViewTest(DatabaseTestCase):
+
+    def _post(self, data, content_type='application/json'):
+        return self.client.post(reverse('btree_app:batch'), json.dumps(data), content_type=content_type)
+
+    def test_batch(self):
+        response = self._post({'put': [{'key': 1, 'value': 'a'}, {'key': 2, 'value': 'b'}], 'get': [1, 3]})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'put': [True, True], 'get': ['a', None]}, response.json())
+
+        response = self._post({'put': [{'key': 2, 'value': 'c'}], 'delete': [1, 9], 'get': [1, 2]})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'put': [False], 'delete': [True, False], 'get': [None, 'c']}, response.json())
+
+    def test_rejects_get(self):
+        self.assertEqual(405, self.client.get(reverse('btree_app:batch')).status_code)
+
+    def test_rejects_non_json_content_type(self):
+        response = self._post({'get': [1]}, content_type='application/x-www-form-urlencoded')
+        self.assertEqual(415, response.status_code)
+
+    def test_rejects_invalid_batches(self):
+        for data in (
+                [],
+                {'get': 1},
+                {'get': [-1]},
+                {'delete': [2 ** 32]},
+                {'put': [{'key': 1}]},
+                {'put': ['value']},
+                {'get': list(range(views.batch_limit + 1))},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(400, self._post(data).status_code)
+        response = self.client.post(reverse('btree_app:batch'), 'not json', content_type='application/json')
+        self.assertEqual(400, response.status_code)
+        self.assertEqual([], db_operations.read_all())
+
+
+class BulkLoadCommandTest(DatabaseTestCase):
+
+    def _load(self, file_name, content, *args):
+        path = db_operations.name + file_name
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        out = StringIO()
+        call_command('bulk_load', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_csv(self):
+        self.assertIn('Loaded 3 records', self._load('.csv', '3,c\n1,a\n\n2,"b, quoted"\n'))
+        self.assertEqual([(1, 'a'), (2, 'b, quoted'), (3, 'c')], db_operations.read_all())
+
+    def test_jsonl_presorted_with_fill_factor(self):
+        content = ''.join(json.dumps({'key': key, 'value': str(key)}) + '\n' for key in range(500))
+        self._load('.jsonl', content, '--presorted', '--fill-factor', '0.5')
+        self.assertEqual([(key, str(key)) for key in range(500)], db_operations.read_all())
+
+    def test_truncate(self):
+        db_operations.insert_or_update_many([{'key': 7, 'value': 'old'}])
+        self._load('.data', '{"key": 1, "value": "a"}\n', '--format', 'jsonl', '--truncate')
+        self.assertEqual([(1, 'a')], db_operations.read_all())
+
+    def test_invalid_input(self):
+        for file_name, content, args in (
+                ('.csv', '2,b\n1,a\n', ('--presorted',)),
+                ('.csv', 'x,a\n', ()),
+                ('.jsonl', '{"key": 1}\n', ()),
+                ('.csv', '1,a\n', ('--fill-factor', '0')),
+        ):
+            with self.subTest(content=content, args=args), self.assertRaises(CommandError):
+                self._load(file_name, content, *args)
+        with self.assertRaises(CommandError):
+            call_command('bulk_load', db_operations.name + '.missing')
+
+
+class ExportViewTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        db_operations.insert_or_update_many({'key': key, 'value': f'value, {key}'} for key in range(300))
+
+    def _export(self, file_format):
+        response = self.client.get(reverse('btree_app:export', args=[file_format]))
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.streaming)
+        return b''.join(response).decode()
+
+    def test_csv(self):
+        lines = self._export('csv').splitlines()
+        self.assertEqual(['key,value', '0,"value, 0"'], lines[:2])
+        self.assertEqual(301, len(lines))
+
+    def test_json(self):
+        expected = [{'key': key, 'value': f'value, {key}'} for key in range(300)]
+        self.assertEqual(expected, json.loads(self._export('json')))
+
+    def test_unknown_format(self):
+        self.assertEqual(404, self.client.get(reverse('btree_app:export', args=['xml'])).status_code)
+
+
+class MetricsViewTest(DatabaseTestCase):
+
+    def test_prometheus_text(self):
+        db_operations.insert_or_update_many({'key': key, 'value': str(key)} for key in range(10))
+        response = self.client.get(reverse('btree_app:metrics'))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('text/plain; version=0.0.4; charset=utf-8', response['Content-Type'])
+        lines = response.content.decode().splitlines()
+        self.assertIn('# TYPE btree_node_saves_total counter', lines)
+        self.assertIn('# TYPE btree_put_many_seconds histogram', lines)
+        self.assertIn('btree_put_many_seconds_count 1', lines)
+
+
+class PaginationViewTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rows = [(key, f'value {key}') for key in range(0, 240, 2)]
+        db_operations.insert_or_update_many({'key': key, 'value': value} for key, value in self.rows)
+
+    def _get(self, **params):
+        response = self.client.get(reverse('btree_app:view_all'), params)
+        self.assertEqual(200, response.status_code)
+        return response.context
+
+    def test_first_page(self):
+        context = self._get(limit=50)
+        self.assertEqual(self.rows[:50], context['data'])
+        self.assertEqual(self.rows[49][0], context['next_after'])
+        summary = tuple(context[name] for name in ('total', 'first', 'last', 'page', 'pages'))
+        self.assertEqual((120, 1, 50, 1, 3), summary)
+
+    def test_keyset_pages(self):
+        rows = []
+        after = None
+        while True:
+            context = self._get(limit=50) if after is None else self._get(after=after, limit=50)
+            self.assertEqual(len(rows) + 1, context['first'])
+            rows.extend(context['data'])
+            after = context['next_after']
+            if after is None:
+                break
+        self.assertEqual(self.rows, rows)
+
+    def test_previous_pages(self):
+        context = self._get(page=3, limit=50)
+        rows = context['data']
+        while context['prev_before'] is not None:
+            context = self._get(before=context['prev_before'], limit=50)
+            rows = context['data'] + rows
+        self.assertEqual(self.rows, rows)
+        self.assertEqual(1, context['first'])
+
+    def test_before_key_between_rows(self):
+        context = self._get(before=99, limit=5)
+        self.assertEqual(self.rows[45:50], context['data'])
+        self.assertEqual((46, self.rows[45][0]), (context['first'], context['prev_before']))
+        self.assertEqual(self.rows[49][0], context['next_after'])
+
+    def test_numbered_pages(self):
+        context = self._get(page=2, limit=50)
+        self.assertEqual(self.rows[50:100], context['data'])
+        self.assertEqual((51, 2), (context['first'], context['page']))
+        context = self._get(page=3, limit=50)
+        self.assertEqual(self.rows[100:], context['data'])
+        self.assertIsNone(context['next_after'])
+        context = self._get(page=4, limit=50)
+        self.assertEqual([], context['data'])
+        self.assertEqual(120, context['total'])
+
+    def test_after_key_between_rows(self):
+        context = self._get(after=99, limit=5)
+        self.assertEqual(self.rows[50:55], context['data'])
+        self.assertEqual(51, context['first'])
+
+    def test_default_page_size(self):
+        self.assertEqual(self.rows[:views.page_size], self._get()['data'])
+
+    def test_rejects_invalid_parameters(self):
+        invalid = ({'limit': 0}, {'limit': 1001}, {'after': -1}, {'before': -1}, {'page': 0}, {'page': 'x'})
+        for params in invalid:
+            with self.subTest(params=params):
+                response = self.client.get(reverse('btree_app:view_all'), params)
+                self.assertEqual(400, response.status_code)
@@ -14,4 +14,7 @@ urlpatterns = [
     path('view/<int:key>', views.view, name='view'),
     path('delete_all/', views.delete_all, name='delete_all'),
     path('view_all/', views.view_all, name='view_all'),
+    path('export/<str:file_format>', views.export, name='export'),
+    path('batch/', views.batch, name='batch'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
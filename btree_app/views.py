@@ -1,19 +1,29 @@
+import csv
+import json
+import django
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render, redirect
-from .forms import InsertForm, UpdateForm, DeleteForm, ReadForm
+from .forms import InsertForm, UpdateForm, DeleteForm, ReadForm, PageForm, KeyForm, KeyValueForm
 from btree_db import db_operations
 
+page_size = 50
+batch_limit = 1000
 
-def index(request):
+
+async def index(request):
     context = {'form': ''}
     return render(request, 'btree_app/index.html', context)
 
 
-def insert(request):
+async def insert(request):
     if request.method == 'POST':
         form = InsertForm(data=request.POST)
         if form.is_valid():
-            db_operations.insert_or_update(form.data)
-            return redirect('btree_app:inserted')
+            if await db_operations.ainsert(form.cleaned_data):
+                return redirect('btree_app:inserted')
+            form.add_error('key', 'Key already exists')
     else:
         form = InsertForm()
 
@@ -21,16 +31,17 @@ def insert(request):
     return render(request, 'btree_app/insert.html', context)
 
 
-def inserted(request):
+async def inserted(request):
     return render(request, 'btree_app/inserted.html')
 
 
-def update(request):
+async def update(request):
     if request.method == 'POST':
         form = UpdateForm(data=request.POST)
         if form.is_valid():
-            db_operations.insert_or_update(form.data)
-            return redirect('btree_app:updated')
+            if await db_operations.aupdate(form.cleaned_data):
+                return redirect('btree_app:updated')
+            form.add_error('key', "Key doesn't exists")
     else:
         form = UpdateForm()
 
@@ -38,16 +49,20 @@ def update(request):
     return render(request, 'btree_app/update.html', context)
 
 
-def updated(request):
+async def updated(request):
     return render(request, 'btree_app/updated.html')
 
 
-def delete(request):
+async def delete(request):
     if request.method == 'POST':
         form = DeleteForm(data=request.POST)
         if form.is_valid():
-            db_operations.delete(form.data)
-            return redirect('btree_app:deleted')
+            try:
+                await db_operations.adelete(form.cleaned_data)
+            except KeyError:
+                form.add_error('key', "Key doesn't exists")
+            else:
+                return redirect('btree_app:deleted')
     else:
         form = DeleteForm()
 
@@ -55,20 +70,26 @@ def delete(request):
     return render(request, 'btree_app/delete.html', context)
 
 
-def deleted(request):
+async def deleted(request):
     return render(request, 'btree_app/deleted.html')
 
 
-def delete_all(request):
-    db_operations.delete_all()
+async def delete_all(request):
+    await db_operations.adelete_all()
     return render(request, 'btree_app/deleted_all.html')
 
 
-def read(request):
+async def read(request):
     if request.method == 'POST':
         form = ReadForm(data=request.POST)
         if form.is_valid():
-            return redirect('btree_app:view', key=form.data['key'])
+            key = form.cleaned_data['key']
+            try:
+                value = await db_operations.aread({'key': key})
+            except KeyError:
+                form.add_error('key', "Key doesn't exists")
+            else:
+                return render(request, 'btree_app/view.html', {'value': value, 'key': key})
     else:
         form = ReadForm()
 
@@ -76,13 +97,143 @@ def read(request):
     return render(request, 'btree_app/read.html', context)
 
 
-def view(request, key):
-    value = db_operations.read({'key': key})
+async def view(request, key):
+    try:
+        value = await db_operations.aread({'key': key})
+    except KeyError:
+        raise Http404
     context = {'value': value, 'key': key}
     return render(request, 'btree_app/view.html', context)
 
 
-def view_all(request):
-    data = db_operations.read_all()
-    context = {'data': data}
+async def view_all(request):
+    form = PageForm(data=request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    after = form.cleaned_data['after']
+    limit = form.cleaned_data['limit'] or page_size
+    data, next_after, prev_before, offset, total = await db_operations.aread_page(
+        after, limit, form.cleaned_data['page'], form.cleaned_data['before']
+    )
+    context = {
+        'data': data,
+        'after': after,
+        'limit': limit,
+        'next_after': next_after,
+        'prev_before': prev_before,
+        'total': total,
+        'first': offset + 1,
+        'last': offset + len(data),
+        'page': offset // limit + 1,
+        'pages': max(1, -(-total // limit))
+    }
     return render(request, 'btree_app/view_all.html', context)
+
+
+class _Echo:
+
+    def write(self, value):
+        return value
+
+
+def _export_csv():
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['key', 'value'])
+    for key, value in db_operations.iter_all():
+        yield writer.writerow([key, value])
+
+
+def _export_json():
+    yield '['
+    separator = ''
+    for key, value in db_operations.iter_all():
+        yield separator + json.dumps({'key': key, 'value': value})
+        separator = ','
+    yield ']'
+
+
+async def _aexport_csv():
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['key', 'value'])
+    async for key, value in await db_operations.aiter_all():
+        yield writer.writerow([key, value])
+
+
+async def _aexport_json():
+    yield '['
+    separator = ''
+    async for key, value in await db_operations.aiter_all():
+        yield separator + json.dumps({'key': key, 'value': value})
+        separator = ','
+    yield ']'
+
+
+_exporters = {
+    'csv': (_export_csv, _aexport_csv, 'text/csv'),
+    'json': (_export_json, _aexport_json, 'application/json')
+}
+
+
+async def export(request, file_format):
+    if file_format not in _exporters:
+        raise Http404
+    export_sync, export_async, content_type = _exporters[file_format]
+    # StreamingHttpResponse only accepts async iterators from Django 4.2 on
+    content = export_async() if django.VERSION >= (4, 2) else export_sync()
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{db_operations.name}.{file_format}"'
+    return response
+
+
+def _clean_batch(data):
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    for name in ('get', 'put', 'delete'):
+        if not isinstance(data.get(name, []), list):
+            raise ValueError(f"'{name}' must be a list")
+    if sum(len(data.get(name, [])) for name in ('get', 'put', 'delete')) > batch_limit:
+        raise ValueError(f'At most {batch_limit} operations per batch')
+    cleaned = {}
+    if 'put' in data:
+        cleaned['put'] = []
+        for item in data['put']:
+            form = KeyValueForm(data=item if isinstance(item, dict) else {})
+            if not form.is_valid():
+                raise ValueError(form.errors.as_text())
+            cleaned['put'].append(form.cleaned_data)
+    for name in ('delete', 'get'):
+        if name in data:
+            cleaned[name] = []
+            for key in data[name]:
+                form = KeyForm(data={'key': key})
+                if not form.is_valid():
+                    raise ValueError(form.errors.as_text())
+                cleaned[name].append(form.cleaned_data['key'])
+    return cleaned
+
+
+async def batch(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    if request.content_type != 'application/json':
+        return HttpResponse('Content-Type must be application/json', status=415)
+    try:
+        data = _clean_batch(json.loads(request.body))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    result = {}
+    if 'put' in data:
+        result['put'] = await db_operations.ainsert_or_update_many(data['put'])
+    if 'delete' in data:
+        result['delete'] = await db_operations.adelete_many(data['delete'])
+    if 'get' in data:
+        result['get'] = await db_operations.aread_many(data['get'])
+    return JsonResponse(result)
+
+
+batch.csrf_exempt = True
+
+
+async def metrics(request):
+    text = await db_operations.ametrics_text()
+    return HttpResponse(text, content_type='text/plain; version=0.0.4; charset=utf-8')
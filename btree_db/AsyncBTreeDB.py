@@ -0,0 +1,141 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Self
+
+from .AsyncCursor import AsyncCursor
+from .BTreeDB import BTreeDB
+
+
+class AsyncBTreeDB:
+
+    def __init__(self, db: BTreeDB, workers: int = 4, batch_size: int = 1000):
+        if workers < 1:
+            raise ValueError('workers must be 1 or greater')
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='btree')
+        self._reads = {}
+        self._queued = {}
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self._run(self.db.close)
+        self.shutdown()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait)
+
+    async def _run(self, function: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
+
+    async def _write(self, keys: Iterable[int], function: Callable, *args):
+        try:
+            return await self._run(function, *args)
+        finally:
+            for key in keys:
+                self._reads.pop(key, None)
+
+    async def get(self, key: int, default: str | None = None) -> str | None:
+        loop = asyncio.get_running_loop()
+        futures = self._reads.setdefault(key, {})
+        future = futures.get(loop)
+        if future is None:
+            future = futures[loop] = loop.create_future()
+            queue = self._queued.get(loop)
+            if queue is None:
+                queue = self._queued[loop] = []
+                loop.call_soon(self._dispatch, loop)
+            queue.append((key, future))
+        value = await asyncio.shield(future)
+        return default if value is None else value
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        queue = self._queued.pop(loop)
+        for start in range(0, len(queue), self.batch_size):
+            chunk = queue[start:start + self.batch_size]
+            try:
+                task = loop.run_in_executor(self._executor, self.db.get_many, [key for key, _ in chunk])
+            except RuntimeError as e:
+                task = loop.create_future()
+                task.set_exception(e)
+            task.add_done_callback(partial(self._resolve, loop, chunk))
+
+    def _resolve(self, loop: asyncio.AbstractEventLoop, chunk: list[tuple[int, asyncio.Future]], task: asyncio.Future):
+        error = task.exception()
+        values = None if error is not None else task.result()
+        for i, (key, future) in enumerate(chunk):
+            futures = self._reads.get(key)
+            if futures is not None and futures.get(loop) is future:
+                del futures[loop]
+                if not futures:
+                    del self._reads[key]
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(values[i])
+
+    async def get_many(self, keys: Iterable[int]) -> list[str | None]:
+        return await self._run(self.db.get_many, list(keys))
+
+    async def contains(self, key: int) -> bool:
+        return await self._run(self.db.__contains__, key)
+
+    async def count(self) -> int:
+        return await self._run(self.db.__len__)
+
+    async def rank(self, key: int) -> int:
+        return await self._run(self.db.rank, key)
+
+    async def nth(self, index: int) -> int:
+        return await self._run(self.db.nth, index)
+
+    async def count_range(self, lo: int = None, hi: int = None) -> int:
+        return await self._run(self.db.count_range, lo, hi)
+
+    async def put(self, key: int, value: str):
+        await self._write((key,), self.db.__setitem__, key, value)
+
+    async def insert_if_absent(self, key: int, value: str) -> bool:
+        return await self._write((key,), self.db.insert_if_absent, key, value)
+
+    async def update_if_present(self, key: int, value: str) -> bool:
+        return await self._write((key,), self.db.update_if_present, key, value)
+
+    async def delete(self, key: int) -> str:
+        return await self._write((key,), self.db.pop, key)
+
+    async def put_many(self, items: Iterable[tuple[int, str]]) -> list[bool]:
+        items = list(items)
+        return await self._write([key for key, _ in items], self.db.put_many, items)
+
+    async def delete_many(self, keys: Iterable[int]) -> list[bool]:
+        keys = list(keys)
+        return await self._write(keys, self.db.delete_many, keys)
+
+    async def clear(self):
+        try:
+            await self._run(self.db.clear)
+        finally:
+            self._reads.clear()
+
+    async def checkpoint(self):
+        await self._run(self.db.checkpoint)
+
+    async def vacuum(self, fill_factor: float = 1.0) -> int:
+        return await self._run(self.db.vacuum, fill_factor)
+
+    def range(self, lo: int = None, hi: int = None, reverse: bool = False, chunk_size: int = 256) -> AsyncCursor:
+        return AsyncCursor(self.db.range(lo, hi, reverse), self._executor, chunk_size)
+
+    def items(self, start: int = None, reverse: bool = False, chunk_size: int = 256) -> AsyncCursor:
+        return AsyncCursor(self.db.items(start, reverse), self._executor, chunk_size)
+
+    def keys(self, start: int = None, reverse: bool = False, chunk_size: int = 256) -> AsyncCursor:
+        return AsyncCursor(self.db.keys(start, reverse), self._executor, chunk_size)
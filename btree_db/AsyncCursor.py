@@ -0,0 +1,33 @@
+import asyncio
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Iterator, Self
+
+
+class AsyncCursor:
+
+    def __init__(self, cursor: Iterator, executor: Executor, chunk_size: int = 256):
+        self._cursor = cursor
+        self._executor = executor
+        self.chunk_size = chunk_size
+        self._chunk = []
+        self._position = 0
+        self._exhausted = False
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self):
+        if self._position == len(self._chunk):
+            if self._exhausted:
+                raise StopAsyncIteration
+            self._chunk = await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: list(islice(self._cursor, self.chunk_size))
+            )
+            self._position = 0
+            self._exhausted = len(self._chunk) < self.chunk_size
+            if not self._chunk:
+                raise StopAsyncIteration
+        item = self._chunk[self._position]
+        self._position += 1
+        return item
@@ -0,0 +1,289 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterator
+
+from .BPlusNode import BPlusNode
+from .Index import Index
+from .IndexFile import IndexFile
+
+
+class BPlusIndex(Index):
+
+    ENGINE = 1
+    node_class = BPlusNode
+
+    def _create_node(self, leaf: bool = True) -> BPlusNode:
+        node = super()._create_node()
+        node.leaf = leaf
+        return node
+
+    def _search_recursive(self, pointer: int, key: int, path: list[tuple[int, int]]) -> int | None:
+        node = self.read(pointer)
+        if len(path) < self.pinned_levels:
+            self._pool.pin(pointer)
+        self.comparisons += node.size.bit_length()
+        if node.is_leaf:
+            index = bisect_left(node.keys, key)
+            path.append((pointer, index))
+            if index < node.size and node.keys[index] == key:
+                return node.pointers[index]
+            return None
+        index = bisect_right(node.keys, key)
+        path.append((pointer, index))
+        return self._search_recursive(node.children[index], key, path)
+
+    def _search_many(self, pointer: int, keys: list[int], start: int, end: int, results: list, path: list):
+        node = self.read(pointer)
+        if node.is_leaf:
+            for position in range(start, end):
+                index = bisect_left(node.keys, keys[position])
+                if index < node.size and node.keys[index] == keys[position]:
+                    results[position] = node.pointers[index], path + [(pointer, index)]
+                else:
+                    results[position] = None, path + [(pointer, index)]
+            return
+        position = start
+        while position < end:
+            index = bisect_right(node.keys, keys[position])
+            boundary = end if index == node.size else bisect_left(keys, node.keys[index], position, end)
+            self._search_many(node.children[index], keys, position, boundary, results, path + [(pointer, index)])
+            position = boundary
+
+    def rank(self, key: int) -> int:
+        rank = 0
+        node = self.read(self.root_pointer)
+        while not node.is_leaf:
+            index = bisect_right(node.keys, key)
+            rank += sum(node.counts[:index])
+            node = self.read(node.children[index])
+        return rank + bisect_left(node.keys, key)
+
+    def nth(self, index: int) -> tuple[int, int]:
+        if index < 0:
+            index += self.key_count
+        if not 0 <= index < self.key_count:
+            raise IndexError('index out of range')
+        node = self.read(self.root_pointer)
+        while not node.is_leaf:
+            child = 0
+            while index >= node.counts[child]:
+                index -= node.counts[child]
+                child += 1
+            node = self.read(node.children[child])
+        return node.keys[index], node.pointers[index]
+
+    def split_node(self, node: BPlusNode, path: list[tuple[int, int]]):
+        self.metrics.splits += 1
+        self.structure_version += 1
+        new_node = self._create_node(node.is_leaf)
+        middle = node.size // 2
+        if node.is_leaf:
+            separator = node.keys[middle]
+            new_node.keys, node.keys = node.keys[middle:], node.keys[:middle]
+            new_node.pointers, node.pointers = node.pointers[middle:], node.pointers[:middle]
+            new_node.next, node.next = node.next, new_node.pointer
+        else:
+            separator = node.keys[middle]
+            new_node.keys, node.keys = node.keys[middle + 1:], node.keys[:middle]
+            new_node.children, node.children = node.children[middle + 1:], node.children[:middle + 1]
+            new_node.counts, node.counts = node.counts[middle + 1:], node.counts[:middle + 1]
+        self._modified(node, new_node)
+
+        if path:
+            parent_pointer, index = path[-1]
+            parent = self.read(parent_pointer)
+            parent.keys.insert(index, separator)
+            parent.children.insert(index + 1, new_node.pointer)
+            parent.counts[index] = node.total
+            parent.counts.insert(index + 1, new_node.total)
+            self._modified(parent)
+            if parent.is_full:
+                self.split_node(parent, path[:-1])
+        else:
+            parent = self._create_node(leaf=False)
+            parent.keys.append(separator)
+            parent.children.extend((node.pointer, new_node.pointer))
+            parent.counts.extend((node.total, new_node.total))
+            self._set_root(parent.pointer)
+
+    def _delete(self, path: list[tuple[int, int]]):
+        node_pointer, index = path[-1]
+        node = self.read(node_pointer)
+        node.remove(index)
+        self._modified(node)
+        self._count(path[:-1], -1)
+        if node.is_min:
+            self._rebalance(node, path[:-1])
+
+    def _rebalance(self, node: BPlusNode, path: list[tuple[int, int]]):
+        if not path:
+            if not node.is_leaf and node.is_empty:
+                self._clear_node(node)
+                self._set_root(node.children[0])
+            return
+
+        parent_pointer, index = path[-1]
+        parent = self.read(parent_pointer)
+        left = self.read(parent.children[index - 1]) if index > 0 else None
+        right = self.read(parent.children[index + 1]) if index + 1 < len(parent.children) else None
+
+        if left is not None and left.size > self.node_class.capacity(self.t) // 2:
+            self._borrow_left(node, left, parent, index)
+        elif right is not None and right.size > self.node_class.capacity(self.t) // 2:
+            self._borrow_right(node, right, parent, index)
+        elif left is not None:
+            self._merge_siblings(left, node, parent, index - 1)
+        else:
+            self._merge_siblings(node, right, parent, index)
+
+        if parent.is_min:
+            self._rebalance(parent, path[:-1])
+
+    def _borrow_left(self, node: BPlusNode, left: BPlusNode, parent: BPlusNode, index: int):
+        self.metrics.redistributions += 1
+        self.structure_version += 1
+        if node.is_leaf:
+            node.insert(0, *left.remove(-1))
+            parent.keys[index - 1] = node.keys[0]
+            moved = 1
+        else:
+            node.keys.insert(0, parent.keys[index - 1])
+            parent.keys[index - 1] = left.keys.pop()
+            node.children.insert(0, left.children.pop())
+            moved = left.counts.pop()
+            node.counts.insert(0, moved)
+        parent.counts[index - 1] -= moved
+        parent.counts[index] += moved
+        self._modified(node, left, parent)
+
+    def _borrow_right(self, node: BPlusNode, right: BPlusNode, parent: BPlusNode, index: int):
+        self.metrics.redistributions += 1
+        self.structure_version += 1
+        if node.is_leaf:
+            node.append(*right.remove(0))
+            parent.keys[index] = right.keys[0]
+            moved = 1
+        else:
+            node.keys.append(parent.keys[index])
+            parent.keys[index] = right.keys.pop(0)
+            node.children.append(right.children.pop(0))
+            moved = right.counts.pop(0)
+            node.counts.append(moved)
+        parent.counts[index] += moved
+        parent.counts[index + 1] -= moved
+        self._modified(node, right, parent)
+
+    def _merge_siblings(self, left: BPlusNode, right: BPlusNode, parent: BPlusNode, index: int):
+        self.metrics.merges += 1
+        self.structure_version += 1
+        separator = parent.keys.pop(index)
+        parent.children.pop(index + 1)
+        parent.counts[index] += parent.counts.pop(index + 1)
+        if left.is_leaf:
+            left.keys.extend(right.keys)
+            left.pointers.extend(right.pointers)
+            left.next = right.next
+        else:
+            left.keys.append(separator)
+            left.keys.extend(right.keys)
+            left.children.extend(right.children)
+            left.counts.extend(right.counts)
+        self._modified(left, parent)
+        self._clear_node(right)
+
+    def _leaf_for(self, key: int | None) -> BPlusNode:
+        node = self.read(self.root_pointer)
+        while not node.is_leaf:
+            node = self.read(node.children[0 if key is None else bisect_right(node.keys, key)])
+        return node
+
+    def _scan_forward(self, lo: int | None, hi: int | None) -> Iterator[tuple[int, int]]:
+        node = self._leaf_for(lo)
+        index = 0 if lo is None else bisect_left(node.keys, lo)
+        while True:
+            while index < node.size:
+                key = node.keys[index]
+                if hi is not None and key >= hi:
+                    return
+                yield key, node.pointers[index]
+                index += 1
+            if node.next is None:
+                return
+            node = self.read(node.next)
+            index = 0
+
+    def _scan_backward(self, lo: int | None, hi: int | None) -> Iterator[tuple[int, int]]:
+        stack = []
+        node = self.read(self.root_pointer)
+        while not node.is_leaf:
+            index = len(node.children) - 1 if hi is None else bisect_left(node.keys, hi)
+            stack.append([node, index])
+            node = self.read(node.children[index])
+        while True:
+            index = node.size if hi is None else bisect_left(node.keys, hi)
+            while index > 0:
+                index -= 1
+                key = node.keys[index]
+                if lo is not None and key < lo:
+                    return
+                yield key, node.pointers[index]
+            while stack and stack[-1][1] == 0:
+                stack.pop()
+            if not stack:
+                return
+            stack[-1][1] -= 1
+            node = self.read(stack[-1][0].children[stack[-1][1]])
+            while not node.is_leaf:
+                stack.append([node, len(node.children) - 1])
+                node = self.read(node.children[-1])
+            hi = None
+
+    def _build(self, index_file: IndexFile, keys: array, pointers: array, fill_factor: float) -> int:
+        capacity = self.node_class.capacity(self.t)
+        minimum = capacity // 2
+        target = max(minimum, min(capacity, round(fill_factor * capacity)))
+        levels = [self._group_sizes(len(keys), target, minimum, capacity)]
+        while len(levels[-1]) > 1:
+            levels.append(self._group_sizes(len(levels[-1]), target + 1, minimum + 1, capacity + 1))
+
+        offsets = [0]
+        for sizes in levels:
+            offsets.append(offsets[-1] + len(sizes))
+        first_keys = None
+        totals = None
+        for level, sizes in enumerate(levels):
+            position = 0
+            level_first_keys = []
+            level_totals = []
+            for i, size in enumerate(sizes):
+                node = self.node_class(offsets[level] + i, self.t, leaf=level == 0)
+                if level == 0:
+                    node.keys = keys[position:position + size]
+                    node.pointers = pointers[position:position + size]
+                    node.next = node.pointer + 1 if i < len(sizes) - 1 else None
+                else:
+                    node.children = array(node.children.typecode, range(
+                        offsets[level - 1] + position, offsets[level - 1] + position + size
+                    ))
+                    node.keys = array(
+                        node.keys.typecode, (keys[first_keys[j]] for j in range(position + 1, position + size))
+                    )
+                    node.counts = array(node.counts.typecode, totals[position:position + size])
+                level_first_keys.append(position if level == 0 else first_keys[position])
+                level_totals.append(node.total)
+                position += size
+                index_file.write(node.pointer, node.to_bytes())
+            first_keys = level_first_keys
+            totals = level_totals
+        self._next_pointer = offsets[-1]
+        return offsets[-1] - 1
+
+    @staticmethod
+    def _group_sizes(count: int, target: int, minimum: int, capacity: int) -> list[int]:
+        if count <= capacity:
+            return [count]
+        groups = -(-count // target)
+        if count // groups < minimum:
+            groups = count // minimum
+        size, extra = divmod(count, groups)
+        return [size + (i < extra) for i in range(groups)]
@@ -0,0 +1,86 @@
+import sys
+from array import array
+from typing import Self
+
+from .BTreeNode import BTreeNode
+from .Converter import Converter
+
+
+class BPlusNode(BTreeNode):
+
+    __slots__ = ('leaf', 'next')
+
+    LEAF = 2
+
+    def __init__(self, pointer: int, t: int, leaf: bool = True):
+        super().__init__(pointer, t)
+        self.leaf = leaf
+        self.next = None
+
+    @classmethod
+    def capacity(cls, t: int) -> int:
+        return 3 * t
+
+    @classmethod
+    def page_size(cls, t: int, node_format: int = BTreeNode.FORMAT) -> int:
+        if not node_format:
+            return super().page_size(t, node_format)
+        return 4 * (cls.HEADER_LENGTH + 3 * cls.capacity(t) + 2)
+
+    @classmethod
+    def memory_size(cls, t: int) -> int:
+        return sys.getsizeof(cls(0, t)) + cls._arrays_size(3, cls.capacity(t) + 2)
+
+    @classmethod
+    def from_bytes(cls, pointer: int, t: int, page: bytes) -> Self | None:
+        page = memoryview(page)
+        flag, _, size, extra = Converter.to_uint32_array(page[:4 * cls.HEADER_LENGTH])
+        if flag == cls.FREE:
+            return None
+        leaf = flag == cls.LEAF
+        if leaf:
+            body_length = 2 * size
+        else:
+            body_length = 3 * size + 2 if flag == cls.COUNTED else 2 * size + 1
+        body = Converter.to_uint32_array(page[4 * cls.HEADER_LENGTH:4 * (cls.HEADER_LENGTH + body_length)])
+        node = cls(pointer, t, leaf)
+        node.keys = body[:size]
+        if leaf:
+            node.pointers = body[size:]
+            node.next = None if extra == cls.NO_PARENT else extra
+        else:
+            node.children = body[size:2 * size + 1]
+            node.counts = body[2 * size + 1:]
+        return node
+
+    def to_bytes(self) -> bytes:
+        if self.leaf:
+            header = (self.LEAF, self.NO_PARENT, self.size, self.NO_PARENT if self.next is None else self.next)
+        else:
+            header = (self.COUNTED, self.NO_PARENT, self.size, len(self.children))
+        page = array(Converter.uint32_typecode, header)
+        page.extend(self.keys)
+        if self.leaf:
+            page.extend(self.pointers)
+        else:
+            page.extend(self.children)
+            page.extend(self.counts)
+        if sys.byteorder == 'big':
+            page.byteswap()
+        return page.tobytes()
+
+    @property
+    def is_full(self) -> bool:
+        return self.size > self.capacity(self.t)
+
+    @property
+    def is_min(self) -> bool:
+        return self.size < self.capacity(self.t) // 2
+
+    @property
+    def is_leaf(self) -> bool:
+        return self.leaf
+
+    @property
+    def total(self) -> int:
+        return self.size if self.leaf else sum(self.counts)
@@ -1,36 +1,382 @@
-from typing import Literal, Self
+import os
+import random
+from array import array
+from contextlib import nullcontext
+from glob import escape, glob
+from operator import ge
+from threading import Event, Lock, Thread
+from typing import Iterable, Iterator, Literal, Self
+from .BPlusIndex import BPlusIndex
 from .BTreeIO import BTreeIO
+from .Compressor import Compressor
+from .Converter import Converter
+from .Cursor import Cursor
+from .FileLock import FileLock
 from .Index import Index
+from .MappedReader import MappedReader
+from .Metrics import Metrics
+from .ReaderPool import ReaderPool
+from .ReadWriteLock import ReadWriteLock
+from .SharedLock import SharedLock
+from .Snapshot import Snapshot
+from .Superblock import Superblock
+from .ValueCache import ValueCache
+from .WriteAheadLog import WriteAheadLog
 
 
 class BTreeDB:
 
+    ENGINES = {'btree': Index, 'bplus': BPlusIndex}
+    BULK_CHUNK_SIZE = 4096
+
     def __init__(
             self,
             name: str,
             t: int,
-            truncate: bool = True
+            truncate: bool = True,
+            engine: Literal['btree', 'bplus'] = 'btree',
+            readers: int = 0,
+            mmap: bool = False,
+            wal: bool = False,
+            checkpoint_interval: float = 30.0,
+            checkpoint_size: int = 16 * 2 ** 20,
+            vacuum_ratio: float | None = None,
+            vacuum_min_size: int = 16 * 2 ** 20,
+            shared: bool = False,
+            shadow: bool = False,
+            metrics: bool = False,
+            compression: bool | Compressor = False,
+            value_cache: int = 0,
+            memory_budget: int = 32 * 2 ** 20
     ):
         if t < 2:
             raise ValueError('t can only be 2 or greater')
+        if engine not in self.ENGINES:
+            raise ValueError(f"Engine can only be one of {', '.join(self.ENGINES)}")
+        if readers and mmap:
+            raise ValueError('readers and mmap cannot be combined')
         self._mode = None
         self.name = name
-        self._io = BTreeIO(name, truncate)
-        self._index = Index(name, t, truncate)
+        self.readers = readers
+        self.mmap = mmap
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_size = checkpoint_size
+        self.vacuum_ratio = vacuum_ratio
+        self.vacuum_min_size = vacuum_min_size
+        self.shared = shared
+        self.metrics = Metrics(metrics)
+        if isinstance(compression, Compressor):
+            self.compressor = compression
+        else:
+            self.compressor = Compressor() if compression else Compressor(None)
+        self.value_cache = ValueCache(value_cache, self.metrics) if value_cache else None
+        self.memory_budget = memory_budget
+        self._readers = None
+        self._mapped = None
+        self._vacuum_lock = Lock()
+        self._io_lock = Lock()
+        self._maintainer = None
+        self._maintenance_requested = Event()
+        self._reclaimers = []
+        if shared:
+            self._lock = SharedLock(f'{name}.block', self._refresh, self._publish)
+            self._vacuum_file_lock = FileLock(f'{name}.bvacuum')
+            with self._vacuum_file_lock if truncate else nullcontext(), self._lock.exclusive():
+                self._load(t, truncate, engine, wal, shadow)
+        else:
+            self._lock = ReadWriteLock()
+            self._vacuum_file_lock = None
+            self._load(t, truncate, engine, wal, shadow)
+
+    def _load(self, t: int, truncate: bool, engine: str, wal: bool, shadow: bool):
+        self._wal = None
+        self._wal_position = 0
+        pages, superblock, operations = [], None, []
+        self.compressor.load(self.name, truncate)
+        if wal:
+            self._wal = WriteAheadLog(self.name, truncate)
+            if not truncate:
+                pages, superblock, operations = self._restore()
+        self.engine = engine if truncate else self._stored_engine(engine)
+        self._index = self.ENGINES[self.engine](
+            self.name, t, truncate, self.memory_budget,
+            steal=not wal, shadow=shadow, shared=self.shared, metrics=self.metrics
+        )
+        if superblock is not None:
+            self._index.apply(pages, superblock)
+        self._io = BTreeIO(BTreeIO.name_for(self.name, self._index.data_generation), truncate, self.compressor)
+        if truncate or not self.shared:
+            self._remove_stale_generations()
+        if self._index.live_size is None:
+            self._index.live_size = self._measure_live_size()
+        if operations:
+            self._replay(operations)
+        if self._wal is not None:
+            self._wal_position = self._wal.size
+
+    def _restore(self) -> tuple[list[tuple[int, bytes]], bytes | None, list[tuple[int, int, bytes]]]:
+        pages, superblock, operations, position = self._wal.recover()
+        if not operations:
+            self._wal.truncate(position)
+        if superblock is None:
+            return [], None, operations
+        restored = Superblock.from_bytes(f'{self.name}.bmeta', superblock)
+        try:
+            sequence = Superblock.load(f'{self.name}.bmeta').sequence
+        except FileNotFoundError:
+            sequence = None
+        if restored.sequence == sequence:
+            return pages, superblock, operations
+        index_class = next(
+            index_class for index_class in self.ENGINES.values() if index_class.ENGINE == restored.engine
+        )
+        index_class.restore(self.name, pages, superblock)
+        return [], None, operations
+
+    def _stored_engine(self, engine: str) -> str:
+        try:
+            stored = Superblock.load(f'{self.name}.bmeta').engine
+        except FileNotFoundError:
+            return engine
+        return next(name for name, index_class in self.ENGINES.items() if index_class.ENGINE == stored)
+
+    def _replay(self, operations: list[tuple[int, int, bytes]]):
+        if self._index.data_size is not None and self._io.size > self._index.data_size:
+            self._io.truncate(self._index.data_size)
+        self._io.open('w')
+        for op, key, value in operations:
+            if op == WriteAheadLog.PUT:
+                self._put(key, Converter.to_str(value))
+            elif op == WriteAheadLog.DELETE:
+                try:
+                    self._pop(key)
+                except KeyError:
+                    pass
+        self._checkpoint()
+        self._io.close()
+
+    def _refresh(self, shared: bool):
+        try:
+            sequence = Superblock.load(f'{self.name}.bmeta').sequence
+        except FileNotFoundError:
+            return
+        if sequence != self._index.sequence:
+            data_generation = self._index.data_generation
+            self._close_data()
+            self._index.reload()
+            if self.value_cache is not None and self._index.data_generation != data_generation:
+                self.value_cache.clear()
+            self._io = BTreeIO(BTreeIO.name_for(self.name, self._index.data_generation), compressor=self.compressor)
+            self._open_data()
+            self._wal_position = 0
+        if self._wal is not None:
+            self._catch_up(shared)
+
+    def _catch_up(self, shared: bool):
+        size = self._wal.size
+        if size == self._wal_position:
+            return
+        pages, superblock, operations, position = self._wal.recover(self._wal_position)
+        if superblock is not None:
+            released = self._index.apply(pages, superblock)
+            if self.value_cache is not None:
+                for pointer in released:
+                    self.value_cache.discard(pointer)
+            self._wal_position = position
+            if self._mode == 'w':
+                self._io.to_eof()
+        if shared or self._mode != 'w' or size == position:
+            return
+        if operations:
+            self._close_data()
+            self._replay(operations)
+            self._open_data()
+            if self.value_cache is not None:
+                self.value_cache.clear()
+        else:
+            self._wal.truncate(position)
+
+    def _publish(self):
+        if self._mode is None:
+            return
+        if self._wal is None:
+            self._checkpoint()
+            return
+        self._io.flush()
+        pages = self._index.publish()
+        if pages:
+            self._index.data_size = self._io.size
+            self._wal.publish(pages, self._index.superblock.to_bytes())
+        self._wal_position = self._wal.size
+
+    def _open_data(self):
+        if self._mode is not None:
+            self._io.open(self._mode)
+            self._open_readers()
+
+    def _close_data(self):
+        if self._mode is not None:
+            self._io.close()
+            self._close_readers()
+
+    def _remove_stale_generations(self):
+        current = (self._index.file_name, self._io.file_name)
+        candidates = [
+            file_name for file_name in glob(f'{escape(self.name)}.*.bindex') + glob(f'{escape(self.name)}.*.btree')
+            if file_name[len(self.name) + 1:].split('.')[0].isdigit()
+        ]
+        self._reclaim([
+            file_name for file_name in [f'{self.name}.bindex', f'{self.name}.btree'] + candidates
+            if file_name not in current and os.path.exists(file_name)
+        ])
+
+    def _reclaim(self, file_names: list[str]):
+        self._reclaimers = [reclaimer for reclaimer in self._reclaimers if reclaimer.is_alive()]
+        if file_names:
+            reclaimer = Thread(target=self._remove_files, args=(file_names,), daemon=True)
+            reclaimer.start()
+            self._reclaimers.append(reclaimer)
+
+    @staticmethod
+    def _remove_files(file_names: list[str]):
+        for file_name in file_names:
+            try:
+                os.remove(file_name)
+            except FileNotFoundError:
+                pass
+
+    def _measure_live_size(self) -> int:
+        source = BTreeIO(BTreeIO.name_for(self.name, self._index.data_generation))
+        source.open('r')
+        try:
+            return sum(source.record_size(pointer) for _, pointer in self._index.scan())
+        finally:
+            source.close()
 
     @property
     def closed(self):
         return self._mode is None
 
     def open(self, mode: Literal['r', 'w']) -> Self:
+        if self.shared:
+            self._lock.open()
+            self._vacuum_file_lock.open()
         self._mode = mode
         self._io.open(mode)
+        self._index.open()
+        self._open_readers()
+        if self._wal is not None:
+            self._wal.open()
+        if mode == 'w' and (self._wal is not None or self.vacuum_ratio is not None):
+            self._maintainer = Thread(target=self._maintenance_loop, daemon=True)
+            self._maintainer.start()
         return self
 
     def close(self):
-        self._index.save()
-        self._io.close()
-        self._mode = None
+        if self._maintainer is not None:
+            self._maintainer, maintainer = None, self._maintainer
+            self._maintenance_requested.set()
+            maintainer.join()
+        with self._lock.write():
+            if self._mode == 'w':
+                self._checkpoint()
+            self._index.close()
+            self._io.close()
+            self._close_readers()
+            if self._wal is not None:
+                self._wal.close()
+            self._mode = None
+        if self.shared:
+            self._lock.close()
+            self._vacuum_file_lock.close()
+        for reclaimer in self._reclaimers:
+            reclaimer.join()
+        self._reclaimers = []
+
+    def _open_readers(self):
+        file_name = BTreeIO.name_for(self.name, self._index.data_generation)
+        if self.mmap:
+            self._mapped = MappedReader(file_name, self.compressor)
+        elif self.readers:
+            self._readers = ReaderPool(file_name, self.readers, self.compressor)
+
+    def _close_readers(self):
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        if self._readers is not None:
+            self._readers.close()
+            self._readers = None
+
+    @Metrics.timed('checkpoint')
+    def checkpoint(self):
+        with self._lock.write():
+            self._checkpoint()
+
+    def _checkpoint(self):
+        self._io.flush(sync=True)
+        data_size = self._io.size
+        logged = self._wal is not None and self._wal.size > 0
+        if not logged and not self._index.is_dirty and data_size == self._index.data_size:
+            return
+        self._index.prepare_flush(data_size)
+        if self._wal is not None:
+            self._wal.checkpoint(self._index.dirty_pages(), self._index.superblock.to_bytes())
+        self._index.flush()
+        if self._wal is not None:
+            self._wal.truncate()
+            self._wal_position = 0
+
+    def _maintenance_loop(self):
+        while self._maintainer is not None:
+            self._maintenance_requested.wait(self.checkpoint_interval)
+            self._maintenance_requested.clear()
+            if self._maintainer is None:
+                break
+            if self._wal is not None:
+                self.checkpoint()
+            if self.needs_vacuum:
+                self.vacuum()
+
+    def _log(self, op: int, key: int, value: bytes = b'') -> int | None:
+        if self._wal is None:
+            return None
+        return self._wal.append(op, key, value)
+
+    def _commit(self, lsn: int | None):
+        if lsn is not None:
+            self._wal.commit(lsn)
+            if self._wal.size > self.checkpoint_size or self._index.needs_save:
+                self._maintenance_requested.set()
+        if self._maintainer is not None and self.needs_vacuum:
+            self._maintenance_requested.set()
+
+    @property
+    def shadow(self) -> bool:
+        return self._index.shadow
+
+    @property
+    def index_size(self) -> int:
+        return os.path.getsize(self._index.file_name)
+
+    @property
+    def data_size(self) -> int:
+        return self._io.tell() if self._mode == 'w' else self._io.size
+
+    @property
+    def live_size(self) -> int:
+        return self._index.live_size
+
+    @property
+    def dead_size(self) -> int:
+        return self.data_size - self.live_size
+
+    @property
+    def needs_vacuum(self) -> bool:
+        if self.vacuum_ratio is None:
+            return False
+        data_size = self.data_size
+        return data_size >= self.vacuum_min_size and self.dead_size > self.vacuum_ratio * data_size
 
     def __enter__(self) -> Self:
         return self
@@ -38,47 +384,430 @@ class BTreeDB:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    def _read_value(self, pointer: int) -> str:
+        view = self._read_view(pointer)
+        self.metrics.data_bytes_read += 4 + len(view)
+        return str(view, 'utf-8')
+
+    def _cached_value(self, pointer: int) -> str:
+        if self.value_cache is None:
+            return self._read_value(pointer)
+        value = self.value_cache.get(pointer)
+        if value is None:
+            value = self._read_value(pointer)
+            self.value_cache.put(pointer, value)
+        return value
+
+    def _read_view(self, pointer: int) -> memoryview:
+        if self._mapped is not None:
+            return self._mapped.view(pointer)
+        if self._readers is None:
+            with self._io_lock:
+                return self._io.view(pointer)
+        with self._readers.acquire() as reader:
+            return reader.view(pointer)
+
     def read_db_all(self) -> list[str]:
-        self._io.seek(0)
-        content = []
-        while not self._io.eof:
-            value = self._io.read()
-            content.append(value)
-        return content
+        if self._mode == 'w':
+            self._io.flush()
+        reader = self._mapped or MappedReader(BTreeIO.name_for(self.name, self._index.data_generation), self.compressor)
+        try:
+            return [str(value, 'utf-8') for value in reader.records()]
+        finally:
+            if reader is not self._mapped:
+                reader.close()
 
+    @Metrics.timed('get')
     def __getitem__(self, key: int) -> str:
-        db_pointer, _, _ = self._index.search(key, logging=True)
-        if db_pointer is None:
-            raise KeyError
-        return self._io.read(db_pointer)
+        with self._lock.read():
+            db_pointer = self._index.get(key)
+            if db_pointer is None:
+                raise KeyError
+            return self._cached_value(db_pointer)
+
+    @Metrics.timed('contains')
+    def __contains__(self, key: int) -> bool:
+        with self._lock.read():
+            return self._index.get(key) is not None
+
+    def view(self, key: int) -> memoryview:
+        with self._lock.read():
+            db_pointer = self._index.get(key)
+            if db_pointer is None:
+                raise KeyError
+            return self._read_view(db_pointer)
+
+    def __len__(self) -> int:
+        with self._lock.read():
+            return self._index.key_count
 
+    def rank(self, key: int) -> int:
+        with self._lock.read():
+            return self._index.rank(key)
+
+    def nth(self, index: int) -> int:
+        with self._lock.read():
+            return self._index.nth(index)[0]
+
+    def count_range(self, lo: int = None, hi: int = None) -> int:
+        with self._lock.read():
+            return self._index.count_range(lo, hi)
+
+    @staticmethod
+    def _check_key(key: int):
+        if not 0 <= key < 2 ** 32:
+            raise ValueError(f'Key {key} is out of the uint32 range')
+
+    @Metrics.timed('put')
     def __setitem__(self, key: int, value: str):
-        db_pointer, node_pointer, index = self._index.search(key)
+        self._check_key(key)
+        with self._lock.write():
+            self._put(key, value)
+            lsn = self._log(WriteAheadLog.PUT, key, Converter.to_bytes(value))
+        self._commit(lsn)
+
+    @Metrics.timed('insert')
+    def insert_if_absent(self, key: int, value: str) -> bool:
+        self._check_key(key)
+        with self._lock.write():
+            db_pointer, path = self._index.search(key)
+            if db_pointer is not None:
+                return False
+            self._store(key, value, db_pointer, path)
+            lsn = self._log(WriteAheadLog.PUT, key, Converter.to_bytes(value))
+        self._commit(lsn)
+        return True
+
+    @Metrics.timed('update')
+    def update_if_present(self, key: int, value: str) -> bool:
+        self._check_key(key)
+        with self._lock.write():
+            if not self._index.might_contain(key):
+                return False
+            db_pointer, path = self._index.search(key)
+            if db_pointer is None:
+                return False
+            self._store(key, value, db_pointer, path)
+            lsn = self._log(WriteAheadLog.PUT, key, Converter.to_bytes(value))
+        self._commit(lsn)
+        return True
+
+    def _put(self, key: int, value: str):
+        self._store(key, value, *self._index.search(key))
+
+    def _append(self, value: str | bytes) -> int:
+        size = self._io.write(value)
+        self.metrics.data_bytes_written += size
+        return size
+
+    def _store(self, key: int, value: str, db_pointer: int | None, path: list[tuple[int, int]]):
         new_pointer = self._io.tell()
-        self._io.write(value)
+        self._index.live_size += self._append(value)
+        if self._readers is not None or self._mapped is not None:
+            self._io.flush()
         if db_pointer is not None:
-            self._index.update(node_pointer, index, new_pointer)
+            self._release(db_pointer)
+            self._index.update(path, new_pointer)
         else:
-            self._index.insert(node_pointer, index, key, new_pointer)
+            self._index.insert(path, key, new_pointer)
+
+    def _release(self, pointer: int):
+        self._index.live_size -= self._io.record_size(pointer)
+        if self.value_cache is not None:
+            self.value_cache.discard(pointer)
 
-    def pop(self, key: int):
-        db_pointer, node_pointer, index = self._index.search(key)
+    @Metrics.timed('delete')
+    def pop(self, key: int) -> str:
+        with self._lock.write():
+            value = self._read_value(self._pop(key))
+            lsn = self._log(WriteAheadLog.DELETE, key)
+        self._commit(lsn)
+        return value
+
+    def _pop(self, key: int) -> int:
+        if not self._index.might_contain(key):
+            raise KeyError
+        db_pointer, path = self._index.search(key)
         if db_pointer is None:
             raise KeyError
-        self._index.delete(node_pointer, index)
+        self._release(db_pointer)
+        self._index.delete(path)
+        return db_pointer
 
-    def _traverse_recursive(self, node_pointer: int, content: list[tuple[int, str]]):
-        node = self._index.read(node_pointer)
-        if node.is_leaf:
-            for key, pointer in zip(node.keys, node.pointers):
-                content.append((key, self._io.read(pointer)))
-            return
-        for child, key, pointer in node:
-            self._traverse_recursive(child, content)
-            content.append((key, self._io.read(pointer)))
-        self._traverse_recursive(node.children[-1], content)
+    @Metrics.timed('get_many')
+    def get_many(self, keys: Iterable[int]) -> list[str | None]:
+        keys = list(keys)
+        with self._lock.read():
+            unique = sorted(key for key in set(keys) if self._index.might_contain(key))
+            found = [
+                (db_pointer, key)
+                for key, (db_pointer, _) in zip(unique, self._index.search_many(unique))
+                if db_pointer is not None
+            ]
+            values = {key: self._cached_value(db_pointer) for db_pointer, key in sorted(found)}
+        return [values.get(key) for key in keys]
+
+    @Metrics.timed('put_many')
+    def put_many(self, items: Iterable[tuple[int, str]]) -> list[bool]:
+        items = list(items)
+        latest = dict(items)
+        unique = sorted(latest)
+        for key in unique:
+            self._check_key(key)
+        records = [Converter.to_bytes(latest[key]) for key in unique]
+        packed = [self.compressor.pack(record) for record in records]
+        lsn = None
+        with self._lock.write():
+            position = self._io.tell()
+            self._index.live_size += self._append(b''.join(packed))
+            if self._readers is not None or self._mapped is not None:
+                self._io.flush()
+            existing = set()
+            inserted, pointers, paths = [], [], []
+            for key, record, (db_pointer, path) in zip(unique, packed, self._index.search_many(unique)):
+                if db_pointer is not None:
+                    existing.add(key)
+                    self._release(db_pointer)
+                    self._index.update(path, position)
+                else:
+                    inserted.append(key)
+                    pointers.append(position)
+                    paths.append(path)
+                position += len(record)
+            for i, path in self._index.descending_paths(inserted, paths):
+                self._index.insert(path, inserted[i], pointers[i])
+            for key, record in zip(unique, records):
+                lsn = self._log(WriteAheadLog.PUT, key, record)
+        self._commit(lsn)
+        results = []
+        for key, _ in items:
+            results.append(key not in existing)
+            existing.add(key)
+        return results
+
+    @Metrics.timed('delete_many')
+    def delete_many(self, keys: Iterable[int]) -> list[bool]:
+        keys = list(keys)
+        lsn = None
+        with self._lock.write():
+            unique = sorted(key for key in set(keys) if self._index.might_contain(key))
+            found, pointers, paths = [], [], []
+            for key, (db_pointer, path) in zip(unique, self._index.search_many(unique)):
+                if db_pointer is not None:
+                    found.append(key)
+                    pointers.append(db_pointer)
+                    paths.append(path)
+            for i, path in self._index.descending_paths(found, paths):
+                self._release(pointers[i])
+                self._index.delete(path)
+                lsn = self._log(WriteAheadLog.DELETE, found[i])
+            deleted = set(found)
+        self._commit(lsn)
+        results = []
+        for key in keys:
+            results.append(key in deleted)
+            deleted.discard(key)
+        return results
+
+    @Metrics.timed('bulk_load')
+    def bulk_load(self, items: Iterable[tuple[int, str]], presorted: bool = False, fill_factor: float = 1.0) -> int:
+        with self._lock.write():
+            self._checkpoint()
+            keys = array(Converter.uint32_typecode)
+            pointers = array(Converter.uint32_typecode)
+            start = position = self._io.tell()
+            pack = self.compressor.pack
+            packed = []
+            for key, value in items:
+                self._check_key(key)
+                if presorted and keys and key < keys[-1]:
+                    raise ValueError(f'Key {key} is out of order in presorted input')
+                record = pack(Converter.to_bytes(value))
+                keys.append(key)
+                pointers.append(position)
+                position += len(record)
+                packed.append(record)
+                if len(packed) >= self.BULK_CHUNK_SIZE:
+                    self._append(b''.join(packed))
+                    packed.clear()
+            self._append(b''.join(packed))
+            self._io.flush(sync=True)
+            loaded = len(keys)
+            if not presorted:
+                keys, pointers = self._sort_items(keys, pointers)
+            dead = array(Converter.uint32_typecode)
+            if self._index.key_count or any(map(ge, keys, keys[1:])):
+                keys, pointers = self._merge_items(self._index.scan(), keys, pointers, dead)
+            self._index.data_size = position
+            self._index.live_size += position - start
+            for pointer in dead:
+                self._release(pointer)
+            self._index.bulk_build(keys, pointers, fill_factor)
+            return loaded
+
+    @staticmethod
+    def _sort_items(keys: array, pointers: array) -> tuple[array, array]:
+        packed = sorted(key << 32 | pointer for key, pointer in zip(keys, pointers))
+        sorted_keys = array(Converter.uint32_typecode, (item >> 32 for item in packed))
+        sorted_pointers = array(Converter.uint32_typecode, (item & 0xFFFFFFFF for item in packed))
+        return sorted_keys, sorted_pointers
+
+    @staticmethod
+    def _merge_items(
+            existing: Iterator[tuple[int, int]],
+            keys: array,
+            pointers: array,
+            dead: array
+    ) -> tuple[array, array]:
+        merged_keys = array(Converter.uint32_typecode)
+        merged_pointers = array(Converter.uint32_typecode)
+        current = next(existing, None)
+        i = 0
+        while i < len(keys) or current is not None:
+            if current is None or (i < len(keys) and keys[i] <= current[0]):
+                key, pointer = keys[i], pointers[i]
+                i += 1
+                while i < len(keys) and keys[i] == key:
+                    dead.append(pointer)
+                    pointer = pointers[i]
+                    i += 1
+                if current is not None and current[0] == key:
+                    dead.append(current[1])
+                    current = next(existing, None)
+            else:
+                key, pointer = current
+                current = next(existing, None)
+            merged_keys.append(key)
+            merged_pointers.append(pointer)
+        return merged_keys, merged_pointers
+
+    @Metrics.timed('vacuum')
+    def vacuum(self, fill_factor: float = 1.0) -> int:
+        if self._mode != 'w':
+            raise ValueError("Vacuum requires the database to be opened in 'w' mode")
+        with self._vacuum_lock, self._vacuum_file_lock or nullcontext():
+            with self._lock.write():
+                if self.shared:
+                    self._remove_stale_generations()
+                self._io.flush()
+                snapshot_size = self.data_size
+                generation = self._index.data_generation + 1
+            source = BTreeIO(BTreeIO.name_for(self.name, generation - 1))
+            source.open('r')
+            target = BTreeIO(BTreeIO.name_for(self.name, generation), True, self.compressor)
+            target.open('w')
+            committed = False
+            try:
+                keys = array(Converter.uint32_typecode)
+                old_pointers = array(Converter.uint32_typecode)
+                new_pointers = array(Converter.uint32_typecode)
+                position = 0
+                for key, pointer in Cursor(self._index, self._lock):
+                    if pointer < snapshot_size:
+                        keys.append(key)
+                        old_pointers.append(pointer)
+                        new_pointers.append(position)
+                        position += target.write(source.read_record(pointer))
+
+                new_pointers.append(position)
+
+                with self._lock.write():
+                    self._checkpoint()
+                    live_size = 0
+                    merged_keys = array(Converter.uint32_typecode)
+                    merged_pointers = array(Converter.uint32_typecode)
+                    i = 0
+                    for key, pointer in self._index.scan():
+                        while i < len(keys) and keys[i] < key:
+                            i += 1
+                        if i < len(keys) and keys[i] == key and old_pointers[i] == pointer:
+                            merged_pointers.append(new_pointers[i])
+                            live_size += new_pointers[i + 1] - new_pointers[i]
+                        else:
+                            merged_pointers.append(position)
+                            size = target.write(source.read_record(pointer))
+                            position += size
+                            live_size += size
+                        merged_keys.append(key)
+                    target.flush(sync=True)
+                    target.close()
+
+                    reclaimed = self.data_size - position
+                    self._index.data_generation = generation
+                    self._index.data_size = position
+                    self._index.live_size = live_size
+                    self._index.bulk_build(merged_keys, merged_pointers, fill_factor)
+                    committed = True
+
+                    self._io.close()
+                    self._close_readers()
+                    os.remove(source.file_name)
+                    self._io = target
+                    self._io.open('w')
+                    if self.value_cache is not None:
+                        self.value_cache.clear()
+                    self._open_readers()
+                    return reclaimed
+            finally:
+                source.close()
+                if not committed:
+                    target.close()
+                    os.remove(target.file_name)
+
+    @Metrics.timed('clear')
+    def clear(self):
+        if self._mode != 'w':
+            raise ValueError("Clearing requires the database to be opened in 'w' mode")
+        with self._vacuum_lock, self._vacuum_file_lock or nullcontext():
+            with self._lock.write():
+                self._checkpoint()
+                stale = [self._index.file_name, self._io.file_name]
+                self._index.clear()
+                self._io.close()
+                self._close_readers()
+                self._io = BTreeIO(BTreeIO.name_for(self.name, self._index.data_generation), True, self.compressor)
+                self._io.open('w')
+                if self.value_cache is not None:
+                    self.value_cache.clear()
+                self._open_readers()
+            self._reclaim(stale)
+
+    def train_dictionary(self, samples: int = 1000, size: int = Compressor.DICTIONARY_SIZE) -> int:
+        if self._mode != 'w':
+            raise ValueError("Training requires the database to be opened in 'w' mode")
+        with self._lock.write():
+            pointers = [pointer for _, pointer in self._index.scan()]
+            chosen = sorted(random.sample(pointers, min(samples, len(pointers))))
+            dictionary = Compressor.train((self._read_view(pointer) for pointer in chosen), size)
+            if dictionary:
+                self.compressor.add_dictionary(dictionary)
+            return len(dictionary)
+
+    def range(self, lo: int = None, hi: int = None, reverse: bool = False, raw: bool = False) -> Cursor:
+        return Cursor(self._index, self._lock, lo, hi, reverse, self._read_view if raw else self._read_value)
+
+    def items(self, start: int = None, reverse: bool = False) -> Cursor:
+        if reverse:
+            return self.range(hi=None if start is None else start + 1, reverse=True)
+        return self.range(lo=start)
+
+    def keys(self, start: int = None, reverse: bool = False) -> Iterator[int]:
+        if reverse:
+            cursor = Cursor(self._index, self._lock, hi=None if start is None else start + 1, reverse=True)
+        else:
+            cursor = Cursor(self._index, self._lock, lo=start)
+        return (key for key, _ in cursor)
 
     def traverse(self) -> list[tuple[int, str]]:
-        content = []
-        self._traverse_recursive(self._index.root_pointer, content)
-        return content
+        return list(self.range())
+
+    def snapshot(self) -> Snapshot:
+        if self._mode is None:
+            raise ValueError('Snapshots require an open database')
+        with self._lock.write() if self._mode == 'w' else self._lock.read():
+            if self._mode == 'w':
+                self._checkpoint()
+            index = self._index.snapshot()
+            io = BTreeIO(BTreeIO.name_for(self.name, index.data_generation), compressor=self.compressor)
+            io.open('r')
+        return Snapshot(self._index, index, io)
@@ -1,16 +1,25 @@
+import os
 from typing import Literal
+from .Compressor import Compressor
 from .Converter import Converter
 
 
 class BTreeIO:
 
-    def __init__(self, file_name: str, truncate: bool = False):
+    def __init__(self, file_name: str, truncate: bool = False, compressor: Compressor | None = None):
         self.file_name = file_name + '.btree'
+        self.compressor = compressor or Compressor(None)
         with open(self.file_name, 'ab') as f:
             self._file = f
             if truncate:
                 self._file.truncate(0)
 
+    @classmethod
+    def name_for(cls, db_name: str, generation: int) -> str:
+        if generation == 0:
+            return db_name
+        return f'{db_name}.{generation}'
+
     def seek(self, position: int, whence: int = 0):
         self._file.seek(position, whence)
 
@@ -24,13 +33,26 @@ class BTreeIO:
         if mode == 'r':
             self._file = open(self.file_name, 'rb')
         elif mode == 'w':
-            self._file = open(self.file_name, 'ab')
+            self._file = open(self.file_name, 'a+b')
         else:
             raise ValueError("Mode can only be 'r' or 'w'")
 
     def close(self):
         self._file.close()
 
+    def flush(self, sync: bool = False):
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.file_name)
+
+    def truncate(self, size: int):
+        with open(self.file_name, 'r+b') as f:
+            f.truncate(size)
+
     def _read_int(self) -> int:
         return Converter.to_int(self._file.read(4))
 
@@ -38,12 +60,31 @@ class BTreeIO:
         current_position = self._file.tell()
         if pointer is not None:
             self._file.seek(pointer)
-        size = self._read_int()
-        result = Converter.to_str(self._file.read(size))
+        header = self._read_int()
+        result = str(self.compressor.unpack(header, self._file.read(Compressor.size(header))), 'utf-8')
         if pointer is not None:
             self._file.seek(current_position)
         return result
 
+    def record_size(self, pointer: int) -> int:
+        current_position = self._file.tell()
+        self._file.seek(pointer)
+        size = Compressor.size(self._read_int())
+        self._file.seek(current_position)
+        return 4 + size
+
+    def read_record(self, pointer: int) -> bytes:
+        current_position = self._file.tell()
+        self._file.seek(pointer)
+        header = self._file.read(4)
+        result = header + self._file.read(Compressor.size(Converter.to_int(header)))
+        self._file.seek(current_position)
+        return result
+
+    def view(self, pointer: int) -> memoryview:
+        record = self.read_record(pointer)
+        return self.compressor.unpack(Converter.to_int(record[:4]), memoryview(record)[4:])
+
     @property
     def eof(self) -> bool:
         current_position = self.tell()
@@ -52,11 +93,10 @@ class BTreeIO:
         self.seek(current_position)
         return current_position == eof_position
 
-    def write(self, value: int | str | bytes):
+    def write(self, value: int | str | bytes) -> int:
         if isinstance(value, bytes):
-            self._file.write(value)
+            return self._file.write(value)
         elif isinstance(value, str):
-            self._file.write(Converter.to_bytes(Converter.byte_length(value)))
-            self._file.write(Converter.to_bytes(value))
+            return self._file.write(self.compressor.pack(Converter.to_bytes(value)))
         elif isinstance(value, int):
-            self._file.write(Converter.to_bytes(value))
+            return self._file.write(Converter.to_bytes(value))
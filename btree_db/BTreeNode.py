@@ -1,36 +1,69 @@
-import pickle
-from os import path
+import sys
+from array import array
+from bisect import bisect_left
 from typing import Self
 
+from .Converter import Converter
+
 
 class BTreeNode:
 
-    def __init__(self, db_name: str, pointer: int, t: int):
-        self.db_name = db_name
+    __slots__ = ('pointer', 't', 'keys', 'pointers', 'children', 'counts')
+
+    FREE = 0
+    USED = 1
+    COUNTED = 3
+    FORMAT = 1
+    NO_PARENT = 2 ** 32 - 1
+    HEADER_LENGTH = 4
+
+    def __init__(self, pointer: int, t: int):
         self.pointer = pointer
-        self.file_name = self.file_name_from_pointer(db_name, pointer)
         self.t = t
-        self.children = []
-        self.keys = []
-        self.pointers = []
-        self.parent = None
+        self.keys = array(Converter.uint32_typecode)
+        self.pointers = array(Converter.uint32_typecode)
+        self.children = array(Converter.uint32_typecode)
+        self.counts = array(Converter.uint32_typecode)
 
     @classmethod
-    def file_name_from_pointer(cls, db_name: str, pointer: int):
-        return f'{db_name}_index/{pointer}.bnode'
+    def page_size(cls, t: int, node_format: int = FORMAT) -> int:
+        return 4 * (cls.HEADER_LENGTH + 2 * (2 * t) + (2 if node_format else 1) * (2 * t + 1))
 
     @classmethod
-    def pointer_from_file_name(cls, file_name: str) -> int:
-        return int(path.splitext(path.split(file_name)[1])[0])
+    def memory_size(cls, t: int) -> int:
+        return sys.getsizeof(cls(0, t)) + cls._arrays_size(4, 2 * t + 1)
 
     @classmethod
-    def load(cls, db_name: str, pointer: int | str) -> Self:
-        if isinstance(pointer, int):
-            file_name = cls.file_name_from_pointer(db_name, pointer)
-        else:
-            file_name = pointer
-        with open(file_name, 'rb') as f:
-            return pickle.load(f)
+    def _arrays_size(cls, count: int, length: int) -> int:
+        empty = array(Converter.uint32_typecode)
+        return count * (sys.getsizeof(empty) + empty.itemsize * length)
+
+    @classmethod
+    def from_bytes(cls, pointer: int, t: int, page: bytes) -> Self | None:
+        page = memoryview(page)
+        flag, _, size, children_count = Converter.to_uint32_array(page[:4 * cls.HEADER_LENGTH])
+        if flag == cls.FREE:
+            return None
+        counts_length = children_count if flag == cls.COUNTED else 0
+        body = Converter.to_uint32_array(
+            page[4 * cls.HEADER_LENGTH:4 * (cls.HEADER_LENGTH + 2 * size + children_count + counts_length)]
+        )
+        node = cls(pointer, t)
+        node.keys = body[:size]
+        node.pointers = body[size:2 * size]
+        node.children = body[2 * size:2 * size + children_count]
+        node.counts = body[2 * size + children_count:]
+        return node
+
+    def to_bytes(self) -> bytes:
+        page = array(Converter.uint32_typecode, (self.COUNTED, self.NO_PARENT, self.size, len(self.children)))
+        page.extend(self.keys)
+        page.extend(self.pointers)
+        page.extend(self.children)
+        page.extend(self.counts)
+        if sys.byteorder == 'big':
+            page.byteswap()
+        return page.tobytes()
 
     @property
     def is_full(self) -> bool:
@@ -40,13 +73,6 @@ class BTreeNode:
     def is_min(self) -> bool:
         return self.size < self.t - 1
 
-    @property
-    def level(self) -> int:
-        if self.parent is None:
-            return 0
-        parent_node = self.load(self.db_name, self.parent)
-        return parent_node.level + 1
-
     @property
     def is_leaf(self) -> bool:
         return len(self.children) == 0
@@ -55,15 +81,15 @@ class BTreeNode:
     def size(self) -> int:
         return len(self.keys)
 
+    @property
+    def total(self) -> int:
+        return self.size + sum(self.counts)
+
     @property
     def is_empty(self) -> bool:
         return len(self.keys) == 0
 
-    def save(self):
-        with open(self.file_name, 'wb') as f:
-            pickle.dump(self, f)
-
-    def split_list(self, lst: list) -> tuple[list[int], int, list[int]]:
+    def split_list(self, lst: array) -> tuple[array, int, array]:
         return lst[:self.size // 2], lst[self.size // 2], lst[self.size // 2 + 1:]
 
     def insert(self, index: int, key: int, pointer: int):
@@ -84,67 +110,70 @@ class BTreeNode:
         self.pointers.extend(node.pointers)
         if not self.is_leaf:
             self.children += node.children
+            self.counts += node.counts
 
-    def split(self) -> tuple[int, int, list[int], list[int], list[int]]:
+    def split(self) -> tuple[int, int, array, array, array, array]:
         keys1, mid_key, keys2 = self.split_list(self.keys)
         pointers1, mid_pointer, pointers2 = self.split_list(self.pointers)
         if self.children:
             children1, mid_children, children2 = self.split_list(self.children)
-            self.children = children1 + [mid_children]
+            children1.append(mid_children)
+            self.children = children1
+            counts1, mid_count, counts2 = self.split_list(self.counts)
+            counts1.append(mid_count)
+            self.counts = counts1
         else:
-            children2 = []
+            children2 = array(Converter.uint32_typecode)
+            counts2 = array(Converter.uint32_typecode)
         self.keys = keys1
         self.pointers = pointers1
-        return mid_key, mid_pointer, children2, keys2, pointers2
+        return mid_key, mid_pointer, children2, counts2, keys2, pointers2
 
     def search(self, key: int) -> tuple[int | None, int, int]:
-        comparisons = 0
-        if self.size == 0:
-            return None, 0, comparisons
-        low = 0
-        high = self.size - 1
-        while low <= high:
-            comparisons += 1
-            mid = (low + high) // 2
-            if self.keys[mid] == key:
-                return self.pointers[mid], mid, comparisons
-            elif self.keys[mid] < key:
-                low = mid + 1
-            else:
-                high = mid - 1
-        return None, low, comparisons
-
-    def redistribute_keys_left(self, left_node: Self, right_node: Self):
+        index = bisect_left(self.keys, key)
+        comparisons = self.size.bit_length()
+        if index < self.size and self.keys[index] == key:
+            return self.pointers[index], index, comparisons
+        return None, index, comparisons
+
+    def redistribute_keys_left(self, left_node: Self, right_node: Self, index: int):
         left_node_last_element = left_node.remove(-1)
-        index = self.get_child_index(right_node)
         parent_element = self[index]
 
         self[index] = left_node_last_element
         right_node.insert(0, *parent_element)
 
+        moved = 1
         if not left_node.is_leaf:
             child_pointer = left_node.children.pop(-1)
             right_node.children.insert(0, child_pointer)
+            count = left_node.counts.pop(-1)
+            right_node.counts.insert(0, count)
+            moved += count
+        self.counts[index] -= moved
+        self.counts[index + 1] += moved
 
-    def redistribute_keys_right(self, left_node: Self, right_node: Self):
+    def redistribute_keys_right(self, left_node: Self, right_node: Self, index: int):
         right_node_first_element = right_node.remove(0)
-        index = self.get_child_index(right_node)
         parent_element = self[index]
 
         self[index] = right_node_first_element
         left_node.append(*parent_element)
 
+        moved = 1
         if not right_node.is_leaf:
             child = right_node.children.pop(0)
             left_node.children.append(child)
+            count = right_node.counts.pop(0)
+            left_node.counts.append(count)
+            moved += count
+        self.counts[index] += moved
+        self.counts[index + 1] -= moved
 
-    def get_child_index(self, right_child) -> int:
-        return self.search(right_child.keys[0])[1] - 1
-
-    def merge(self, left_child: Self, right_child: Self):
-        index = self.get_child_index(right_child)
+    def merge(self, left_child: Self, right_child: Self, index: int):
         parent_element = self.remove(index)
         self.children.pop(index + 1)
+        self.counts[index] += 1 + self.counts.pop(index + 1)
 
         left_child.append(*parent_element)
         left_child.extend(right_child)
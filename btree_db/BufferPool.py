@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import RLock
+from typing import Callable
+
+from .BTreeNode import BTreeNode
+from .Metrics import Metrics
+
+
+class BufferPool:
+
+    def __init__(
+            self,
+            load: Callable[[int], BTreeNode],
+            write: Callable[[BTreeNode], None],
+            max_bytes: int,
+            node_size: int,
+            steal: bool = True,
+            metrics: Metrics | None = None
+    ):
+        self._load = load
+        self._write = write
+        self.steal = steal
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.max_nodes = max(1, max_bytes // node_size)
+        self._lru = OrderedDict()
+        self._pinned = {}
+        self._dirty = set()
+        self._holds = 0
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._lru) + len(self._pinned)
+
+    def __contains__(self, pointer: int) -> bool:
+        return pointer in self._lru or pointer in self._pinned
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    def get(self, pointer: int) -> BTreeNode:
+        with self._lock:
+            node = self._cached(pointer)
+        if node is not None:
+            self.metrics.node_cache_hits += 1
+            return node
+        self.metrics.node_cache_misses += 1
+        node = self._load(pointer)
+        with self._lock:
+            cached = self._cached(pointer)
+            if cached is not None:
+                return cached
+            self._lru[pointer] = node
+            self._evict()
+        return node
+
+    def _cached(self, pointer: int) -> BTreeNode | None:
+        node = self._pinned.get(pointer)
+        if node is not None:
+            return node
+        node = self._lru.get(pointer)
+        if node is not None:
+            self._lru.move_to_end(pointer)
+        return node
+
+    def mark_dirty(self, node: BTreeNode):
+        with self._lock:
+            if node.pointer in self._pinned:
+                self._pinned[node.pointer] = node
+            else:
+                self._lru[node.pointer] = node
+                self._lru.move_to_end(node.pointer)
+            self._dirty.add(node.pointer)
+            self._evict()
+
+    def discard(self, pointer: int):
+        with self._lock:
+            self._lru.pop(pointer, None)
+            self._pinned.pop(pointer, None)
+            self._dirty.discard(pointer)
+
+    def retain(self, keep: Callable[[int], bool]):
+        with self._lock:
+            dropped = [pointer for pointer in (*self._lru, *self._pinned) if not keep(pointer)]
+            for pointer in dropped + list(self._dirty):
+                self.discard(pointer)
+
+    def pin(self, pointer: int):
+        with self._lock:
+            if pointer in self._lru:
+                self._pinned[pointer] = self._lru.pop(pointer)
+
+    def unpin_all(self):
+        with self._lock:
+            self._lru.update(self._pinned)
+            self._pinned.clear()
+
+    @contextmanager
+    def hold(self):
+        with self._lock:
+            self._holds += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._holds -= 1
+                self._evict()
+
+    def _evict(self):
+        if self._holds or len(self) <= self.max_nodes:
+            return
+        victims = []
+        excess = len(self) - self.max_nodes
+        for pointer in self._lru:
+            if excess == 0:
+                break
+            if self.steal or pointer not in self._dirty:
+                victims.append(pointer)
+                excess -= 1
+        for pointer in victims:
+            node = self._lru.pop(pointer)
+            if pointer in self._dirty:
+                self._dirty.discard(pointer)
+                self._write(node)
+
+    def dirty_nodes(self) -> list[BTreeNode]:
+        with self._lock:
+            return [
+                self._pinned[pointer] if pointer in self._pinned else self._lru[pointer]
+                for pointer in sorted(self._dirty)
+            ]
+
+    def flush(self):
+        with self._lock:
+            for node in self.dirty_nodes():
+                self._write(node)
+            self._dirty.clear()
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._pinned.clear()
+            self._dirty.clear()
@@ -0,0 +1,116 @@
+import os
+import zlib
+from collections import Counter
+from typing import Iterable
+
+from .Converter import Converter
+
+
+class Compressor:
+
+    FLAG = 2 ** 31
+    MIN_SIZE = 128
+    DICTIONARY_SIZE = 32 * 1024
+    SAMPLE_SIZE = 256 * 1024
+
+    def __init__(self, min_size: int | None = MIN_SIZE, level: int = 6):
+        if not -1 <= level <= 9:
+            raise ValueError('level must be between -1 and 9')
+        self.min_size = min_size
+        self.level = level
+        self.file_name = None
+        self.dictionary = None
+        self._dictionaries = {}
+
+    @classmethod
+    def size(cls, header: int) -> int:
+        return header & (cls.FLAG - 1)
+
+    def load(self, db_name: str, truncate: bool = False):
+        self.file_name = f'{db_name}.bdict'
+        self.dictionary = None
+        self._dictionaries = {}
+        if truncate:
+            if os.path.exists(self.file_name):
+                os.remove(self.file_name)
+        else:
+            self._read()
+
+    def _read(self):
+        try:
+            with open(self.file_name, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        dictionaries = {}
+        position = 0
+        while position + 4 <= len(data):
+            end = position + 4 + Converter.to_int(data[position:position + 4])
+            if end > len(data):
+                break
+            self.dictionary = data[position + 4:end]
+            dictionaries[zlib.adler32(self.dictionary)] = self.dictionary
+            position = end
+        self._dictionaries = dictionaries
+
+    def add_dictionary(self, dictionary: bytes):
+        if self.file_name is None:
+            raise ValueError('Dictionaries require a compressor loaded for a database')
+        with open(self.file_name, 'ab') as f:
+            f.write(Converter.to_bytes(len(dictionary)) + dictionary)
+            f.flush()
+            os.fsync(f.fileno())
+        self._dictionaries[zlib.adler32(dictionary)] = dictionary
+        self.dictionary = dictionary
+
+    def _find_dictionary(self, dictionary_id: int) -> bytes:
+        if dictionary_id not in self._dictionaries and self.file_name is not None:
+            self._read()
+        try:
+            return self._dictionaries[dictionary_id]
+        except KeyError:
+            raise ValueError(f'Compression dictionary {dictionary_id:#010x} is missing') from None
+
+    def encode(self, data: bytes) -> bytes:
+        if self.dictionary is None:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def decode(self, data: bytes) -> bytes:
+        if not data[1] & 0x20:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(zdict=self._find_dictionary(int.from_bytes(data[2:6], 'big')))
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def pack(self, data: bytes) -> bytes:
+        if self.min_size is not None and len(data) >= self.min_size:
+            encoded = self.encode(data)
+            if len(encoded) < len(data):
+                return Converter.to_bytes(self.FLAG | len(encoded)) + encoded
+        return Converter.to_bytes(len(data)) + data
+
+    def unpack(self, header: int, payload: memoryview) -> memoryview:
+        if header & self.FLAG:
+            return memoryview(self.decode(payload))
+        return payload
+
+    @classmethod
+    def train(cls, samples: Iterable[bytes], size: int = DICTIONARY_SIZE, length: int = 8) -> bytes:
+        counts = Counter()
+        total = 0
+        for sample in samples:
+            sample = bytes(sample[:cls.SAMPLE_SIZE - total])
+            counts.update({sample[i:i + length] for i in range(len(sample) - length + 1)})
+            total += len(sample)
+            if total >= cls.SAMPLE_SIZE:
+                break
+        chunks = []
+        dictionary = bytearray()
+        for chunk, count in counts.most_common():
+            if count < 2 or len(dictionary) + length > size:
+                break
+            if chunk not in dictionary:
+                chunks.append(chunk)
+                dictionary += chunk
+        return b''.join(reversed(chunks))
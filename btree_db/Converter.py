@@ -1,5 +1,12 @@
+import sys
+from array import array
+from typing import Iterable
+
+
 class Converter:
 
+    uint32_typecode = 'I' if array('I').itemsize == 4 else 'L'
+
     @classmethod
     def to_bytes(cls, value: int | str) -> bytes:
         if isinstance(value, int):
@@ -20,3 +27,18 @@ class Converter:
     @classmethod
     def to_str(cls, b: bytes) -> str:
         return b.decode()
+
+    @classmethod
+    def to_uint32_array(cls, b: bytes) -> array:
+        result = array(cls.uint32_typecode)
+        result.frombytes(b)
+        if sys.byteorder == 'big':
+            result.byteswap()
+        return result
+
+    @classmethod
+    def from_uint32_array(cls, values: Iterable[int]) -> bytes:
+        result = array(cls.uint32_typecode, values)
+        if sys.byteorder == 'big':
+            result.byteswap()
+        return result.tobytes()
@@ -0,0 +1,201 @@
+import os
+import random
+import sys
+import zlib
+from array import array
+from typing import Iterable, Self
+
+from .Converter import Converter
+
+
+class CuckooFilter:
+
+    MAGIC = b'BTC2'
+    BUCKET_SIZE = 4
+    LOAD_FACTOR = 0.9
+    MAX_KICKS = 500
+    MASK64 = 2 ** 64 - 1
+
+    def __init__(self, capacity: int):
+        bucket_count = 1
+        while bucket_count * self.BUCKET_SIZE * self.LOAD_FACTOR < capacity:
+            bucket_count *= 2
+        self.bucket_count = bucket_count
+        self.count = 0
+        self._slots = array('H', bytes(2 * bucket_count * self.BUCKET_SIZE))
+        self._dirty = None
+        self._saved_header = None
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[int], capacity: int) -> Self:
+        keys = list(keys)
+        capacity = max(capacity, len(keys))
+        while True:
+            cuckoo_filter = cls(capacity)
+            if cuckoo_filter._add_all(keys):
+                return cuckoo_filter
+            capacity *= 2
+
+    def _add_all(self, keys: list[int]) -> bool:
+        slots = self._slots
+        mix = self._mix
+        mask = self.bucket_count - 1
+        placed = 0
+        for key in keys:
+            h = mix(key)
+            start = (h & mask) * self.BUCKET_SIZE
+            try:
+                slots[slots.index(0, start, start + self.BUCKET_SIZE)] = (h >> 48) % 65535 + 1
+                placed += 1
+            except ValueError:
+                if not self.add(key):
+                    return False
+        self.count += placed
+        return True
+
+    @property
+    def capacity(self) -> int:
+        return int(self.bucket_count * self.BUCKET_SIZE * self.LOAD_FACTOR)
+
+    @classmethod
+    def _mix(cls, x: int) -> int:
+        x = (x + 0x9E3779B97F4A7C15) & cls.MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & cls.MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & cls.MASK64
+        return x ^ (x >> 31)
+
+    def _locate(self, key: int) -> tuple[int, int, int]:
+        h = self._mix(key)
+        fingerprint = (h >> 48) % 65535 + 1
+        first = h & (self.bucket_count - 1)
+        return fingerprint, first, self._alternate(first, fingerprint)
+
+    def _alternate(self, bucket: int, fingerprint: int) -> int:
+        return bucket ^ (self._mix(fingerprint) & (self.bucket_count - 1))
+
+    def _find(self, bucket: int, fingerprint: int) -> int:
+        start = bucket * self.BUCKET_SIZE
+        for slot in range(start, start + self.BUCKET_SIZE):
+            if self._slots[slot] == fingerprint:
+                return slot
+        return -1
+
+    def _set(self, slot: int, fingerprint: int) -> int:
+        previous = self._slots[slot]
+        self._slots[slot] = fingerprint
+        if self._dirty is not None:
+            self._dirty.add(slot // self.BUCKET_SIZE)
+        return previous
+
+    def __contains__(self, key: int) -> bool:
+        fingerprint, first, second = self._locate(key)
+        return self._find(first, fingerprint) >= 0 or self._find(second, fingerprint) >= 0
+
+    def add(self, key: int) -> bool:
+        fingerprint, first, second = self._locate(key)
+        for bucket in (first, second):
+            slot = self._find(bucket, 0)
+            if slot >= 0:
+                self._set(slot, fingerprint)
+                self.count += 1
+                return True
+        bucket = random.choice((first, second))
+        for _ in range(self.MAX_KICKS):
+            slot = bucket * self.BUCKET_SIZE + random.randrange(self.BUCKET_SIZE)
+            fingerprint = self._set(slot, fingerprint)
+            bucket = self._alternate(bucket, fingerprint)
+            slot = self._find(bucket, 0)
+            if slot >= 0:
+                self._set(slot, fingerprint)
+                self.count += 1
+                return True
+        return False
+
+    def remove(self, key: int) -> bool:
+        fingerprint, first, second = self._locate(key)
+        for bucket in (first, second):
+            slot = self._find(bucket, fingerprint)
+            if slot >= 0:
+                self._set(slot, 0)
+                self.count -= 1
+                return True
+        return False
+
+    @classmethod
+    def load(cls, file_name: str, tag: bytes) -> Self:
+        with open(file_name, 'rb') as f:
+            data = f.read()
+        if data[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError(f'{file_name} is not a filter file')
+        position = len(cls.MAGIC)
+        tag_length = Converter.to_int(data[position:position + 4])
+        position += 4
+        if data[position:position + tag_length] != tag:
+            raise ValueError(f'{file_name} does not match the index')
+        position += tag_length
+        count, bucket_count, checksum = Converter.to_uint32_array(data[position:position + 12])
+        position += 12
+        slot_bytes = data[position:position + 2 * bucket_count * cls.BUCKET_SIZE]
+        if len(slot_bytes) != 2 * bucket_count * cls.BUCKET_SIZE or zlib.crc32(slot_bytes) != checksum:
+            raise ValueError(f'{file_name} is corrupt')
+        cuckoo_filter = cls(0)
+        cuckoo_filter.bucket_count = bucket_count
+        cuckoo_filter.count = count
+        cuckoo_filter._slots = array('H')
+        cuckoo_filter._slots.frombytes(slot_bytes)
+        if sys.byteorder == 'big':
+            cuckoo_filter._slots.byteswap()
+        cuckoo_filter._dirty = set()
+        cuckoo_filter._saved_header = data[:position]
+        return cuckoo_filter
+
+    def save(self, file_name: str, tag: bytes):
+        slots = self._slots
+        if sys.byteorder == 'big':
+            slots = array('H', slots)
+            slots.byteswap()
+        slot_bytes = slots.tobytes()
+        header = self.MAGIC + Converter.to_bytes(len(tag)) + tag + Converter.from_uint32_array(
+            (self.count, self.bucket_count, zlib.crc32(slot_bytes))
+        )
+        if self._dirty is not None and len(header) == len(self._saved_header or b'') \
+                and self._read_header(file_name, len(header)) == self._saved_header:
+            bucket_bytes = 2 * self.BUCKET_SIZE
+            with open(file_name, 'r+b') as f:
+                for bucket in sorted(self._dirty):
+                    f.seek(len(header) + bucket * bucket_bytes)
+                    f.write(slot_bytes[bucket * bucket_bytes:(bucket + 1) * bucket_bytes])
+                f.seek(0)
+                f.write(header)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            temp_file_name = file_name + '.tmp'
+            with open(temp_file_name, 'wb') as f:
+                f.write(header)
+                f.write(slot_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file_name, file_name)
+        self._dirty = set()
+        self._saved_header = header
+
+    @classmethod
+    def retag(cls, file_name: str, tag: bytes, new_tag: bytes) -> bool:
+        prefix = cls.MAGIC + Converter.to_bytes(len(tag)) + tag
+        if len(new_tag) != len(tag) or cls._read_header(file_name, len(prefix)) != prefix:
+            return False
+        with open(file_name, 'r+b') as f:
+            f.seek(len(cls.MAGIC) + 4)
+            f.write(new_tag)
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+
+    @staticmethod
+    def _read_header(file_name: str, size: int) -> bytes | None:
+        try:
+            with open(file_name, 'rb') as f:
+                return f.read(size)
+        except FileNotFoundError:
+            return None
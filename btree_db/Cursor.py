@@ -0,0 +1,45 @@
+from typing import Callable, Iterator, Self
+
+from .Index import Index
+from .ReadWriteLock import ReadWriteLock
+
+
+class Cursor:
+
+    def __init__(
+            self,
+            index: Index,
+            lock: ReadWriteLock,
+            lo: int = None,
+            hi: int = None,
+            reverse: bool = False,
+            read_value: Callable[[int], str | memoryview] = None
+    ):
+        self._index = index
+        self._lock = lock
+        self.lo = lo
+        self.hi = hi
+        self.reverse = reverse
+        self._read_value = read_value
+        self._scan = None
+        self._version = None
+
+    def __iter__(self) -> Self:
+        return self
+
+    def _seek(self) -> Iterator[tuple[int, int]]:
+        return self._index.scan(self.lo, self.hi, self.reverse)
+
+    def __next__(self) -> tuple[int, int | str | memoryview]:
+        with self._lock.read():
+            if self._scan is None or self._version != self._index.version:
+                self._scan = self._seek()
+                self._version = self._index.version
+            key, pointer = next(self._scan)
+            if self.reverse:
+                self.hi = key
+            else:
+                self.lo = key + 1
+            if self._read_value is None:
+                return key, pointer
+            return key, self._read_value(pointer)
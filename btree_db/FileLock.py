@@ -0,0 +1,56 @@
+import time
+from typing import Self
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self._file = open(file_name, 'a+b')
+
+    def acquire(self, shared: bool = False, blocking: bool = True) -> bool:
+        if fcntl is not None:
+            flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(self._file.fileno(), flags)
+            except BlockingIOError:
+                return False
+            return True
+        while True:
+            self._file.seek(0)
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.001)
+
+    def release(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self) -> Self:
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def open(self):
+        if self._file.closed:
+            self._file = open(self.file_name, 'a+b')
+
+    def close(self):
+        self._file.close()
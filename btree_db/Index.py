@@ -1,227 +1,866 @@
 import os
-from os import mkdir, listdir
-from shutil import rmtree
-from typing import Literal
+from array import array
+from bisect import bisect_left
+from copy import copy
+from threading import Lock
+from typing import Iterator, Self
 
 from .BTreeNode import BTreeNode
+from .BufferPool import BufferPool
+from .Converter import Converter
+from .CuckooFilter import CuckooFilter
+from .FileLock import FileLock
+from .IndexFile import IndexFile
+from .Metrics import Metrics
+from .ShadowIndexFile import ShadowIndexFile
+from .Superblock import Superblock
 
 
 class Index:
 
-    def __init__(self, db_name: str, t: int, truncate: bool, max_nodes_in_memory: int = 2048):
+    ENGINE = 0
+    FILTER_CAPACITY = 1024
+    node_class = BTreeNode
+
+    def __init__(
+            self,
+            db_name: str,
+            t: int,
+            truncate: bool,
+            memory_budget: int = 32 * 2 ** 20,
+            pinned_levels: int = 2,
+            steal: bool = True,
+            shadow: bool = False,
+            shared: bool = False,
+            metrics: Metrics | None = None
+    ):
         self.db_name = db_name
-        self.dir_name = f'{db_name}_index/'
-        self.max_nodes_in_memory = max_nodes_in_memory
+        self.superblock_file_name = f'{db_name}.bmeta'
+        self.filter_file_name = f'{db_name}.bfilter'
+        self.memory_budget = memory_budget
+        self.pinned_levels = pinned_levels
+        self.steal = steal
+        self.shared = shared
         self.t = t
 
+        self.metrics = metrics if metrics is not None else Metrics()
         self.comparisons = 0
+        self.version = 0
+        self.structure_version = 0
+        self._published = {}
+        self._unpublished = set()
 
         if truncate:
-            try:
-                rmtree(self.dir_name)
-            except FileNotFoundError:
-                pass
-            mkdir(self.dir_name)
-            self.root_pointer = 0
-            self.max_pointer = 0
-            self._root = BTreeNode(db_name, 0, t)
+            self.shadow = shadow
+            self._reset(self._stored_superblock())
         else:
-            self.root_pointer = self._get_root_pointer()
-            self.max_pointer = self._get_max_pointer()
-            self._root = BTreeNode.load(db_name, self.root_pointer)
-        self._unsaved_nodes = {self.root_pointer: self._root}
+            self._open(self._load_superblock())
+        self._freed = set()
+        self._snapshots = {}
+        self._snapshot_mutex = Lock()
+        self._filter_mutex = Lock()
+        self._filter_tag = None
+        self._snapshot_lock = FileLock(f'{db_name}.bsnapshot') if shared else None
+        self._snapshot_probe = FileLock(f'{db_name}.bsnapshot') if shared else None
+        self._open_pool()
+        if truncate:
+            self._filter = CuckooFilter(self.FILTER_CAPACITY)
+            self._save_superblock()
+        else:
+            self._load_filter()
+            if self.node_format != self.node_class.FORMAT:
+                self._upgrade()
+
+    def _reset(self, stored: Superblock | None):
+        self.table_pointer = None
+        self.node_format = self.node_class.FORMAT
+        self.index_generation = 0 if stored is None else stored.index_generation + 1
+        self.data_generation = 0 if stored is None else stored.data_generation + 1
+        self.file_name = self.file_name_for(self.db_name, self.index_generation)
+        self._file = self._open_file(self.file_name, truncate=True)
+        self.root_pointer = 0
+        self.max_pointer = 0
+        self.key_count = 0
+        self.data_size = 0
+        self.live_size = 0
+        self.sequence = 0 if stored is None else stored.sequence
+        self._saved_superblock = b''
+        root = self.node_class(0, self.t)
+        self._file.write(self.root_pointer, root.to_bytes())
+        self._file.flush(sync=True)
+
+    def clear(self):
+        old_file = self._file
+        self._reset(self.superblock)
+        old_file.close()
+        self._freed.clear()
+        self._published.clear()
+        self._unpublished.clear()
+        self._pool.clear()
+        self._filter = CuckooFilter(self.FILTER_CAPACITY)
+        self.version += 1
+        self._save_superblock()
+        self._pool.get(self.root_pointer)
+        self._set_root(self.root_pointer)
+
+    def _load_superblock(self) -> Superblock | None:
+        try:
+            superblock = Superblock.load(self.superblock_file_name)
+        except FileNotFoundError:
+            return None
+        if superblock.engine != self.ENGINE:
+            raise ValueError(f'{self.superblock_file_name} was created with a different index engine')
+        return superblock
+
+    def _stored_superblock(self) -> Superblock | None:
+        try:
+            return Superblock.load(self.superblock_file_name)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _open(self, superblock: Superblock | None):
+        if superblock is not None:
+            self.t = superblock.t
+            self.index_generation = superblock.index_generation
+            self.table_pointer = superblock.table_pointer
+            self.node_format = superblock.node_format
+        else:
+            self.index_generation = 0
+            self.table_pointer = None
+            self.node_format = self.node_class.FORMAT
+        self.shadow = self.table_pointer is not None
+        self.file_name = self.file_name_for(self.db_name, self.index_generation)
+        self._file = self._open_file(self.file_name)
+        if self.shadow and not self.shared:
+            self._file.reclaim_orphans()
+        if superblock is None:
+            superblock = self._recover_superblock()
+        self._saved_superblock = superblock.to_bytes()
+        self.root_pointer = superblock.root_pointer
+        self.max_pointer = superblock.max_pointer
+        self.key_count = superblock.key_count
+        self.data_size = superblock.data_size
+        self.live_size = superblock.live_size
+        self.data_generation = superblock.data_generation
+        self.sequence = superblock.sequence
+
+    def _open_file(self, file_name: str, truncate: bool = False) -> IndexFile:
+        page_size = self.node_class.page_size(self.t, self.node_format)
+        if self.shadow:
+            return ShadowIndexFile(file_name, page_size, truncate, None if truncate else self.table_pointer)
+        return IndexFile(file_name, page_size, truncate)
+
+    def _open_pool(self):
+        self._pool = BufferPool(
+            self._load,
+            self._write,
+            self.memory_budget,
+            self.node_class.memory_size(self.t),
+            self.steal or (self.shadow and not self.shared),
+            self.metrics
+        )
+        self._pool.get(self.root_pointer)
+        self._pool.pin(self.root_pointer)
+
+    def reload(self):
+        superblock = self._load_superblock()
+        old_file, old_sequence = self._file, self.sequence
+        old_file.close()
+        self._open(superblock)
+        self._freed.clear()
+        self._published.clear()
+        self._unpublished.clear()
+        if self.shadow and isinstance(old_file, ShadowIndexFile) and old_file.file_name == self.file_name:
+            self._file.adopt(old_file)
+            if self.sequence == (old_sequence + 1) % Superblock.UNKNOWN:
+                self._pool.retain(lambda pointer: old_file.physical(pointer) == self._file.physical(pointer))
+                self._pool.get(self.root_pointer)
+                self._set_root(self.root_pointer)
+            else:
+                self._open_pool()
+        else:
+            self._open_pool()
+        self._load_filter()
+        self.version += 1
+
+    def publish(self) -> list[tuple[int, bytes]]:
+        pages = [
+            (pointer, b'' if pointer in self._freed else self.read(pointer).to_bytes())
+            for pointer in sorted(self._unpublished)
+        ]
+        self._unpublished.clear()
+        return pages
+
+    def apply(self, pages: list[tuple[int, bytes]], superblock: bytes) -> set[int]:
+        old_keys = set()
+        new_keys = set()
+        old_pointers = set()
+        new_pointers = set()
+        for pointer, page in dict(pages).items():
+            if pointer <= self.max_pointer:
+                node = self._pool.get(pointer) if pointer in self._pool else self._load(pointer)
+                if node is not None:
+                    old_keys.update(node.keys[:len(node.pointers)])
+                    old_pointers.update(node.pointers)
+            self._published[pointer] = page
+            self._pool.discard(pointer)
+            if page:
+                node = self.node_class.from_bytes(pointer, self.t, page)
+                if node is not None:
+                    new_keys.update(node.keys[:len(node.pointers)])
+                    new_pointers.update(node.pointers)
+        superblock = Superblock.from_bytes(self.superblock_file_name, superblock)
+        self.max_pointer = superblock.max_pointer
+        self.key_count = superblock.key_count
+        self.data_size = superblock.data_size
+        self.live_size = superblock.live_size
+        self._pool.get(superblock.root_pointer)
+        self._set_root(superblock.root_pointer)
+        cuckoo_filter = self._cuckoo_filter()
+        for key in old_keys - new_keys:
+            cuckoo_filter.remove(key)
+        for key in new_keys - old_keys:
+            if cuckoo_filter.count >= cuckoo_filter.capacity or not cuckoo_filter.add(key):
+                self._rebuild_filter()
+                break
+        self.version += 1
+        return old_pointers - new_pointers
+
+    @classmethod
+    def file_name_for(cls, db_name: str, generation: int) -> str:
+        if generation == 0:
+            return f'{db_name}.bindex'
+        return f'{db_name}.{generation}.bindex'
+
+    def open(self):
+        self._file.open()
+        if self._snapshot_lock is not None:
+            self._snapshot_lock.open()
+            self._snapshot_probe.open()
+
+    def close(self):
+        self._file.close()
+        if self._snapshot_lock is not None and not self._snapshots:
+            self._snapshot_lock.close()
+            self._snapshot_probe.close()
+
+    @property
+    def is_dirty(self) -> bool:
+        if self._pool.dirty_count or self._freed or self._published or (self.shadow and self._file.is_dirty):
+            return True
+        return self.superblock.to_bytes() != self._saved_superblock
+
+    def prepare_flush(self, data_size: int):
+        self.data_size = data_size
+        self.sequence = (self.sequence + 1) % Superblock.UNKNOWN
+        if self.shadow:
+            self._commit()
+
+    def _commit(self):
+        self.save()
+        self.table_pointer = self._file.commit(self.sequence)
+        self._file.flush(sync=True)
+
+    def flush(self):
+        self.save()
+        self._file.flush(sync=True)
+        self._publish()
+
+    def _save_superblock(self):
+        self.sequence = (self.sequence + 1) % Superblock.UNKNOWN
+        if self.shadow:
+            self._commit()
+        self._publish()
+
+    def _publish(self):
+        superblock = self.superblock
+        superblock.save()
+        self._saved_superblock = superblock.to_bytes()
+        self._save_filter()
+        if self.shadow:
+            self._file.reclaim(self._oldest_snapshot())
+
+    def _oldest_snapshot(self) -> int | None:
+        with self._snapshot_mutex:
+            if self._snapshot_lock is None:
+                return min(self._snapshots, default=None)
+            if self._snapshots or not self._snapshot_probe.acquire(blocking=False):
+                return 0
+            self._snapshot_probe.release()
+            return None
+
+    def snapshot(self) -> Self:
+        if not self.shadow:
+            raise ValueError('Snapshots require an index created with shadow paging')
+        with self._snapshot_mutex:
+            if not self._snapshots and self._snapshot_lock is not None:
+                self._snapshot_lock.acquire(shared=True)
+            self._snapshots[self.sequence] = self._snapshots.get(self.sequence, 0) + 1
+        view = copy(self)
+        view._file = ShadowIndexFile(self.file_name, self._file.page_size, table_pointer=self.table_pointer)
+        view._freed = set()
+        view._published = dict(self._published)
+        view._unpublished = set()
+        view._filter = None
+        view._snapshot_lock = view._snapshot_probe = None
+        view._open_pool()
+        return view
+
+    def release(self, view: Self):
+        view.close()
+        with self._snapshot_mutex:
+            count = self._snapshots.pop(view.sequence) - 1
+            if count:
+                self._snapshots[view.sequence] = count
+            elif not self._snapshots and self._snapshot_lock is not None:
+                self._snapshot_lock.release()
+
+    @classmethod
+    def restore(cls, db_name: str, pages: list[tuple[int, bytes]], superblock: bytes):
+        superblock = Superblock.from_bytes(f'{db_name}.bmeta', superblock)
+        if superblock.table_pointer is None:
+            index_file = IndexFile(
+                cls.file_name_for(db_name, superblock.index_generation),
+                cls.node_class.page_size(superblock.t, superblock.node_format)
+            )
+            for pointer, page in pages:
+                index_file.write(pointer, page)
+            index_file.flush(sync=True)
+            index_file.close()
+        superblock.save()
 
     @property
     def nodes(self) -> list[BTreeNode]:
         nodes = []
-        for file_name in self._node_file_names:
-            nodes.append(BTreeNode.load(self.db_name, file_name))
+        for pointer in range(self._file.page_count):
+            node = self._load(pointer)
+            if node is not None:
+                nodes.append(node)
         return nodes
 
+    def _recover_superblock(self) -> Superblock:
+        nodes = self.nodes
+        max_pointer = max(node.pointer for node in nodes)
+        children = {child for node in nodes for child in node.children}
+        root_pointer = next(node.pointer for node in nodes if node.pointer not in children)
+        key_count = sum(len(node.pointers) for node in nodes)
+        return Superblock(
+            self.superblock_file_name, self.t, root_pointer, max_pointer, key_count, engine=self.ENGINE,
+            node_format=self.node_format
+        )
+
     @property
-    def _node_file_names(self) -> list[str]:
-        return [self.dir_name + name for name in listdir(self.dir_name)]
-
-    def _get_root_pointer(self) -> int:
-        for node in self.nodes:
-            if node.parent is None:
-                return node.pointer
-
-    def _get_max_pointer(self) -> int:
-        return max(node.pointer for node in self.nodes)
-
-    def read(self, pointer: int, modify: bool = True) -> BTreeNode:
-        if len(self._unsaved_nodes) > self.max_nodes_in_memory:
-            self.save(2)
-        if pointer in self._unsaved_nodes.keys():
-            node = self._unsaved_nodes[pointer]
-        else:
-            node = BTreeNode.load(self.db_name, pointer)
-            if modify:
-                self._unsaved_nodes[pointer] = node
-        return node
+    def superblock(self) -> Superblock:
+        return Superblock(
+            self.superblock_file_name,
+            self.t,
+            self.root_pointer,
+            self.max_pointer,
+            self.key_count,
+            self.data_size,
+            self.live_size,
+            self.index_generation,
+            self.data_generation,
+            self.ENGINE,
+            self.sequence,
+            self.table_pointer,
+            self.node_format
+        )
+
+    def _load(self, pointer: int) -> BTreeNode | None:
+        page = self._published.get(pointer)
+        if page is not None:
+            return self.node_class.from_bytes(pointer, self.t, page) if page else None
+        self.metrics.node_loads += 1
+        self.metrics.index_bytes_read += self._file.page_size
+        return self.node_class.from_bytes(pointer, self.t, self._file.read(pointer))
+
+    def _write(self, node: BTreeNode):
+        self.metrics.node_saves += 1
+        self.metrics.index_bytes_written += self._file.page_size
+        self._file.write(node.pointer, node.to_bytes())
+
+    def read(self, pointer: int) -> BTreeNode:
+        return self._pool.get(pointer)
+
+    def _modified(self, *nodes: BTreeNode):
+        for node in nodes:
+            self._pool.mark_dirty(node)
+            if self.shared:
+                self._unpublished.add(node.pointer)
+
+    def _set_root(self, pointer: int):
+        self.root_pointer = pointer
+        self._pool.unpin_all()
+        self._pool.pin(pointer)
 
     def _create_node(self):
-        if len(self._unsaved_nodes) > self.max_nodes_in_memory:
-            self.save(2)
         self.max_pointer += 1
-        new_node = BTreeNode(self.db_name, self.max_pointer, self.t)
-        self._unsaved_nodes[self.max_pointer] = new_node
+        new_node = self.node_class(self.max_pointer, self.t)
+        self._modified(new_node)
         return new_node
 
-    def split_node(self, node: BTreeNode):
+    def split_node(self, node: BTreeNode, path: list[tuple[int, int]]):
+        self.metrics.splits += 1
+        self.structure_version += 1
         new_node = self._create_node()
-        mid_key, mid_pointer, new_node.children, new_node.keys, new_node.pointers = node.split()
-        for child_pointer in new_node.children:
-            child = self.read(child_pointer)
-            child.parent = new_node.pointer
-        if node.parent:
-            parent = self.read(node.parent)
-            new_node.parent = parent.pointer
-            _, index, _ = parent.search(mid_key)
+        mid_key, mid_pointer, new_node.children, new_node.counts, new_node.keys, new_node.pointers = node.split()
+        self._modified(node, new_node)
+        if path:
+            parent_pointer, index = path[-1]
+            parent = self.read(parent_pointer)
             parent.children.insert(index + 1, new_node.pointer)
-            self.insert(node.parent, index, mid_key, mid_pointer)
+            parent.counts[index] = node.total
+            parent.counts.insert(index + 1, new_node.total)
+            self._insert(path, mid_key, mid_pointer)
         else:
             parent = self._create_node()
-            self.root_pointer = node.parent = parent.pointer
-            new_node.parent = parent.pointer
             parent.keys.append(mid_key)
             parent.pointers.append(mid_pointer)
-            parent.children = [node.pointer, new_node.pointer]
-
-    def insert(self, node_pointer: int, index: int, key: int, db_pointer: int):
+            parent.children.extend((node.pointer, new_node.pointer))
+            parent.counts.extend((node.total, new_node.total))
+            self._set_root(parent.pointer)
+
+    def _count(self, path: list[tuple[int, int]], delta: int):
+        for pointer, index in path:
+            node = self.read(pointer)
+            node.counts[index] += delta
+            self._modified(node)
+
+    def insert(self, path: list[tuple[int, int]], key: int, db_pointer: int):
+        with self._pool.hold():
+            self._count(path[:-1], 1)
+            self._insert(path, key, db_pointer)
+        self.key_count += 1
+        self.version += 1
+        cuckoo_filter = self._cuckoo_filter()
+        if cuckoo_filter.count >= cuckoo_filter.capacity or not cuckoo_filter.add(key):
+            self._rebuild_filter()
+
+    def _insert(self, path: list[tuple[int, int]], key: int, db_pointer: int):
+        node_pointer, index = path[-1]
         node = self.read(node_pointer)
         node.insert(index, key, db_pointer)
+        self._modified(node)
         if node.is_full:
-            self.split_node(node)
+            self.split_node(node, path[:-1])
 
-    def update(self, node_pointer: int, index: int, db_pointer: int):
+    def update(self, path: list[tuple[int, int]], db_pointer: int):
+        node_pointer, index = path[-1]
         node = self.read(node_pointer)
         node.pointers[index] = db_pointer
-
-    def search(self, key: int, logging: bool = False) -> tuple[int, int, int]:
-        result = self._search_recursive(self.root_pointer, key)
-        if logging:
-            print(self.comparisons)
+        self._modified(node)
+
+    def might_contain(self, key: int) -> bool:
+        return key in self._cuckoo_filter()
+
+    def get(self, key: int) -> int | None:
+        if key not in self._cuckoo_filter():
+            return None
+        return self.search(key)[0]
+
+    def _load_filter(self):
+        self._filter = None
+        self._filter_tag = self.superblock.to_bytes()
+
+    def _cuckoo_filter(self) -> CuckooFilter:
+        if self._filter is None:
+            with self._filter_mutex:
+                if self._filter is None:
+                    try:
+                        self._filter = CuckooFilter.load(self.filter_file_name, self._filter_tag)
+                    except (FileNotFoundError, ValueError):
+                        self._rebuild_filter()
+                        if not self.is_dirty:
+                            self._save_filter()
+        return self._filter
+
+    def _rebuild_filter(self):
+        self._filter = CuckooFilter.from_keys(
+            (key for key, _ in self.scan()), max(2 * self.key_count, self.FILTER_CAPACITY)
+        )
+
+    def _save_filter(self):
+        tag = self.superblock.to_bytes()
+        if self._filter is not None:
+            self._filter.save(self.filter_file_name, tag)
+        elif tag != self._filter_tag and not CuckooFilter.retag(self.filter_file_name, self._filter_tag, tag):
+            self._cuckoo_filter().save(self.filter_file_name, tag)
+        self._filter_tag = tag
+
+    def search(self, key: int) -> tuple[int | None, list[tuple[int, int]]]:
+        path = []
+        db_pointer = self._search_recursive(self.root_pointer, key, path)
+        if self.metrics.enabled:
+            self.metrics.observe('comparisons', self.comparisons, Metrics.COMPARISON_BUCKETS)
         self.comparisons = 0
-        return result
+        return db_pointer, path
 
-    def _search_recursive(self, pointer: int, key: int):
-        node = self.read(pointer, modify=False)
+    def _search_recursive(self, pointer: int, key: int, path: list[tuple[int, int]]) -> int | None:
+        node = self.read(pointer)
+        if len(path) < self.pinned_levels:
+            self._pool.pin(pointer)
         db_pointer, index, comparisons = node.search(key)
         self.comparisons += comparisons
+        path.append((pointer, index))
 
         if db_pointer is not None or node.is_leaf:
-            return db_pointer, pointer, index
-        child = node.children[index]
-        return self._search_recursive(child, key)
-
-    def _get_sibling(self, which: Literal['l', 'r'], node: BTreeNode, parent: BTreeNode) -> BTreeNode | None:
-        _, index, _ = parent.search(node.keys[0])
-        if which == 'l':
-            sibling_idx = index - 1
-        elif which == 'r':
-            sibling_idx = index + 1
-        else:
-            raise ValueError("Which can only be 'l' or 'r'")
-
-        if not 0 <= sibling_idx < len(parent.children):
-            return
-
-        sibling_pointer = parent.children[sibling_idx]
-        return self.read(sibling_pointer)
+            return db_pointer
+        return self._search_recursive(node.children[index], key, path)
+
+    def search_many(self, keys: list[int]) -> list[tuple[int | None, list[tuple[int, int]]]]:
+        results = [None] * len(keys)
+        if keys:
+            self._search_many(self.root_pointer, keys, 0, len(keys), results, [])
+        return results
+
+    def descending_paths(
+            self, keys: list[int], paths: list[list[tuple[int, int]]]
+    ) -> Iterator[tuple[int, list[tuple[int, int]]]]:
+        searched = self.structure_version
+        finger = finger_version = None
+        for i in range(len(keys) - 1, -1, -1):
+            if self.structure_version == searched:
+                path = paths[i]
+            else:
+                path = self._finger_path(finger, keys[i]) if finger_version == self.structure_version else None
+                if path is None:
+                    path = self.search(keys[i])[1]
+            finger, finger_version = path, self.structure_version
+            yield i, path
+
+    def _finger_path(self, path: list[tuple[int, int]], key: int) -> list[tuple[int, int]] | None:
+        leaf = self.read(path[-1][0])
+        if not leaf.is_leaf:
+            return None
+        index = bisect_left(leaf.keys, key)
+        if index == 0 and not (leaf.size and leaf.keys[0] == key):
+            return None
+        return path[:-1] + [(leaf.pointer, index)]
+
+    def _search_many(self, pointer: int, keys: list[int], start: int, end: int, results: list, path: list):
+        node = self.read(pointer)
+        position = start
+        while position < end:
+            key = keys[position]
+            index = bisect_left(node.keys, key)
+            if index < node.size and node.keys[index] == key:
+                results[position] = node.pointers[index], path + [(pointer, index)]
+                position += 1
+                continue
+            boundary = end if index == node.size else bisect_left(keys, node.keys[index], position, end)
+            if node.is_leaf:
+                for i in range(position, boundary):
+                    results[i] = None, path + [(pointer, bisect_left(node.keys, keys[i]))]
+            else:
+                self._search_many(node.children[index], keys, position, boundary, results, path + [(pointer, index)])
+            position = boundary
+
+    def rank(self, key: int) -> int:
+        rank = 0
+        node = self.read(self.root_pointer)
+        while True:
+            index = bisect_left(node.keys, key)
+            rank += index + sum(node.counts[:index])
+            if node.is_leaf:
+                return rank
+            if index < node.size and node.keys[index] == key:
+                return rank + node.counts[index]
+            node = self.read(node.children[index])
+
+    def nth(self, index: int) -> tuple[int, int]:
+        if index < 0:
+            index += self.key_count
+        if not 0 <= index < self.key_count:
+            raise IndexError('index out of range')
+        node = self.read(self.root_pointer)
+        while not node.is_leaf:
+            child = 0
+            while index >= node.counts[child]:
+                index -= node.counts[child]
+                if index == 0:
+                    return node.keys[child], node.pointers[child]
+                index -= 1
+                child += 1
+            node = self.read(node.children[child])
+        return node.keys[index], node.pointers[index]
+
+    def count_range(self, lo: int = None, hi: int = None) -> int:
+        end = self.key_count if hi is None else self.rank(hi)
+        start = 0 if lo is None else self.rank(lo)
+        return max(0, end - start)
 
     def _clear_node(self, node: BTreeNode):
-        try:
-            os.remove(node.file_name)
-        except FileNotFoundError:
-            pass
-        self._unsaved_nodes.pop(node.pointer)
-
-    def _merge(self, left_node: BTreeNode, right_node: BTreeNode, parent: BTreeNode):
-        parent.merge(left_node, right_node)
-        for child_pointer in right_node.children:
-            child = self.read(child_pointer)
-            child.parent = left_node.pointer
+        self._freed.add(node.pointer)
+        if self.shared:
+            self._unpublished.add(node.pointer)
+        self._pool.discard(node.pointer)
+
+    def _merge(self, left_node: BTreeNode, right_node: BTreeNode, parent: BTreeNode, index: int):
+        self.metrics.merges += 1
+        self.structure_version += 1
+        parent.merge(left_node, right_node, index)
+        self._modified(parent, left_node)
         self._clear_node(right_node)
-        if parent.is_empty:
-            self.root_pointer = left_node.pointer
-            left_node.parent = None
 
-    def _handle_min_node_deletion(self, node: BTreeNode):
-        if node.parent is None:
+    def _handle_min_node_deletion(self, node: BTreeNode, path: list[tuple[int, int]]):
+        if not path:
             return
 
-        parent = self.read(node.parent)
+        parent_pointer, index = path[-1]
+        parent = self.read(parent_pointer)
 
-        left_sibling = self._get_sibling('l', node, parent)
+        left_sibling = self.read(parent.children[index - 1]) if index > 0 else None
         if left_sibling is not None and not left_sibling.size == self.t - 1:
-            parent.redistribute_keys_left(left_sibling, node)
-            if not node.is_leaf:
-                child = self.read(node.children[0])
-                child.parent = node.pointer
+            parent.redistribute_keys_left(left_sibling, node, index - 1)
+            self.metrics.redistributions += 1
+            self.structure_version += 1
+            self._modified(parent, left_sibling, node)
             return
 
-        right_sibling = self._get_sibling('r', node, parent)
+        right_sibling = self.read(parent.children[index + 1]) if index + 1 < len(parent.children) else None
         if right_sibling is not None and not right_sibling.size == self.t - 1:
-            parent.redistribute_keys_right(node, right_sibling)
-            if not node.is_leaf:
-                child = self.read(node.children[-1])
-                child.parent = node.pointer
+            parent.redistribute_keys_right(node, right_sibling, index)
+            self.metrics.redistributions += 1
+            self.structure_version += 1
+            self._modified(parent, node, right_sibling)
             return
 
         if left_sibling is not None:
-            self._merge(left_sibling, node, parent)
+            self._merge(left_sibling, node, parent, index - 1)
         elif right_sibling is not None:
-            self._merge(node, right_sibling, parent)
+            self._merge(node, right_sibling, parent, index)
 
-        if parent.is_empty:
-            self._clear_node(parent)
+        if len(path) == 1:
+            if parent.is_empty:
+                self._clear_node(parent)
+                self._set_root(parent.children[0])
             return
 
         if parent.is_min:
-            self._handle_min_node_deletion(parent)
+            self._handle_min_node_deletion(parent, path[:-1])
 
-    def _handle_non_leaf_node_deletion(self, node: BTreeNode, index: int):
-        predecessor_node = self._get_predecessor_node(node, index)
+    def _handle_non_leaf_node_deletion(self, node: BTreeNode, path: list[tuple[int, int]]):
+        self.structure_version += 1
+        index = path[-1][1]
+        predecessor_path = self._edge_path(list(path), True)
+        predecessor_node = self.read(predecessor_path[-1][0])
         if not predecessor_node.size == self.t - 1:
+            self._count(predecessor_path[:-1], -1)
             element = predecessor_node.remove(-1)
             node.insert(index, *element)
+            self._modified(predecessor_node, node)
             return
 
-        successor_node = self._get_successor_node(node, index)
+        successor_path = self._edge_path(path[:-1] + [(node.pointer, index + 1)], False)
+        successor_node = self.read(successor_path[-1][0])
         if not successor_node.size == self.t - 1:
+            self._count(successor_path[:-1], -1)
             element = successor_node.remove(0)
             node.insert(index, *element)
+            self._modified(successor_node, node)
             return
 
         node.insert(index, *predecessor_node[-1])
-        self.delete(predecessor_node.pointer, -1)
+        self._modified(node)
+        self._delete(predecessor_path)
 
-    def _get_successor_node(self, node: BTreeNode, index: int) -> BTreeNode:
-        child = self.read(node.children[index + 1])
+    def _edge_path(self, path: list[tuple[int, int]], last: bool) -> list[tuple[int, int]]:
+        node_pointer, index = path[-1]
+        child = self.read(self.read(node_pointer).children[index])
         while not child.is_leaf:
-            child = self.read(child.children[0])
-        return child
-
-    def _get_predecessor_node(self, node: BTreeNode, index: int) -> BTreeNode:
-        child = self.read(node.children[index])
-        while not child.is_leaf:
-            child = self.read(child.children[-1])
-        return child
-
-    def delete(self, node_pointer: int, index: int):
+            index = len(child.children) - 1 if last else 0
+            path.append((child.pointer, index))
+            child = self.read(child.children[index])
+        path.append((child.pointer, child.size - 1 if last else 0))
+        return path
+
+    def delete(self, path: list[tuple[int, int]]):
+        node_pointer, index = path[-1]
+        key = self.read(node_pointer).keys[index]
+        with self._pool.hold():
+            self._delete(path)
+        self.key_count -= 1
+        self.version += 1
+        self._cuckoo_filter().remove(key)
+
+    def _delete(self, path: list[tuple[int, int]]):
+        node_pointer, index = path[-1]
         node = self.read(node_pointer)
         node.remove(index)
+        self._modified(node)
         if node.is_leaf:
+            self._count(path[:-1], -1)
             if node.is_min:
-                self._handle_min_node_deletion(node)
+                self._handle_min_node_deletion(node, path[:-1])
+        else:
+            self._handle_non_leaf_node_deletion(node, path)
+
+    @property
+    def needs_save(self) -> bool:
+        return self._pool.dirty_count > self._pool.max_nodes // 2
+
+    def dirty_pages(self) -> list[tuple[int, bytes]]:
+        pages = [(node.pointer, node.to_bytes()) for node in self._pool.dirty_nodes()]
+        return pages + [(pointer, b'') for pointer in sorted(self._freed)]
+
+    def save(self):
+        for pointer, page in self._published.items():
+            if page:
+                self._file.write(pointer, page)
+            else:
+                self._file.free(pointer)
+        self._published.clear()
+        self._unpublished.clear()
+        self._pool.flush()
+        for pointer in self._freed:
+            self._file.free(pointer)
+        self._freed.clear()
+        self._file.flush()
+
+    def scan(self, lo: int = None, hi: int = None, reverse: bool = False) -> Iterator[tuple[int, int]]:
+        if reverse:
+            return self._scan_backward(lo, hi)
+        return self._scan_forward(lo, hi)
+
+    def _scan_forward(self, lo: int | None, hi: int | None) -> Iterator[tuple[int, int]]:
+        stack = []
+        node = self.read(self.root_pointer)
+        while True:
+            index = 0 if lo is None else bisect_left(node.keys, lo)
+            stack.append([node, index])
+            if node.is_leaf or (index < node.size and node.keys[index] == lo):
+                break
+            node = self.read(node.children[index])
+
+        while stack:
+            node, index = stack[-1]
+            if index >= node.size:
+                stack.pop()
+                continue
+            key = node.keys[index]
+            if hi is not None and key >= hi:
+                return
+            yield key, node.pointers[index]
+            stack[-1][1] = index + 1
+            if not node.is_leaf:
+                child = self.read(node.children[index + 1])
+                stack.append([child, 0])
+                while not child.is_leaf:
+                    child = self.read(child.children[0])
+                    stack.append([child, 0])
+
+    def _scan_backward(self, lo: int | None, hi: int | None) -> Iterator[tuple[int, int]]:
+        stack = []
+        node = self.read(self.root_pointer)
+        while True:
+            index = node.size if hi is None else bisect_left(node.keys, hi)
+            stack.append([node, index])
+            if node.is_leaf:
+                break
+            node = self.read(node.children[index])
+
+        while stack:
+            node, index = stack[-1]
+            if index == 0:
+                stack.pop()
+                continue
+            key = node.keys[index - 1]
+            if lo is not None and key < lo:
+                return
+            yield key, node.pointers[index - 1]
+            stack[-1][1] = index - 1
+            if not node.is_leaf:
+                child = self.read(node.children[index - 1])
+                stack.append([child, child.size])
+                while not child.is_leaf:
+                    child = self.read(child.children[-1])
+                    stack.append([child, child.size])
+
+    def _upgrade(self):
+        keys = array(Converter.uint32_typecode)
+        pointers = array(Converter.uint32_typecode)
+        for key, pointer in self.scan():
+            keys.append(key)
+            pointers.append(pointer)
+        self.bulk_build(keys, pointers)
+
+    def bulk_build(self, keys: array, pointers: array, fill_factor: float = 1.0):
+        if not 0 < fill_factor <= 1:
+            raise ValueError('fill_factor must be in (0, 1]')
+        generation = self.index_generation + 1
+        self.node_format = self.node_class.FORMAT
+        index_file = self._open_file(self.file_name_for(self.db_name, generation), truncate=True)
+        self._next_pointer = 0
+        root_pointer = self._build(index_file, keys, pointers, fill_factor)
+        index_file.flush(sync=True)
+
+        old_file = self._file
+        self._file = index_file
+        self.file_name = index_file.file_name
+        self.index_generation = generation
+        self.root_pointer = root_pointer
+        self.max_pointer = self._next_pointer - 1
+        self.key_count = len(keys)
+        self.version += 1
+        self._filter = CuckooFilter.from_keys(keys, max(2 * len(keys), self.FILTER_CAPACITY))
+        self._pool.clear()
+        self._freed.clear()
+        self._published.clear()
+        self._unpublished.clear()
+        self._save_superblock()
+
+        old_file.close()
+        os.remove(old_file.file_name)
+        self._pool.get(self.root_pointer)
+        self._set_root(self.root_pointer)
+
+    def _build(self, index_file: IndexFile, keys: array, pointers: array, fill_factor: float) -> int:
+        node_size = max(self.t - 1, min(2 * self.t - 1, round(fill_factor * (2 * self.t - 1))))
+        height = 1
+        while (node_size + 1) ** height - 1 < len(keys):
+            height += 1
+        while height > 1 and len(keys) < 2 * (self.t ** (height - 1) - 1) + 1:
+            height -= 1
+        return self._build_subtree(index_file, keys, pointers, 0, len(keys), height, node_size, True)
+
+    def _children_count(self, count: int, height: int, node_size: int, is_root: bool) -> int:
+        lowest = -(-(count + 1) // (2 * self.t) ** (height - 1))
+        highest = (count + 1) // self.t ** (height - 1)
+        target = -(-(count + 1) // (node_size + 1) ** (height - 1))
+        lowest = max(lowest, 2 if is_root else self.t)
+        highest = min(highest, 2 * self.t)
+        return min(max(target, lowest), highest)
+
+    def _build_subtree(
+            self,
+            index_file: IndexFile,
+            keys: array,
+            pointers: array,
+            start: int,
+            count: int,
+            height: int,
+            node_size: int,
+            is_root: bool
+    ) -> int:
+        node = self.node_class(self._next_pointer, self.t)
+        self._next_pointer += 1
+        if height == 1:
+            node.keys = keys[start:start + count]
+            node.pointers = pointers[start:start + count]
         else:
-            self._handle_non_leaf_node_deletion(node, index)
-
-    def save(self, count: int = None):
-        if count is None:
-            count = len(self._unsaved_nodes)
-        for key in list(self._unsaved_nodes.keys())[:count]:
-            self._unsaved_nodes[key].save()
-            self._unsaved_nodes.pop(key)
+            children_count = self._children_count(count, height, node_size, is_root)
+            child_size, extra = divmod(count - children_count + 1, children_count)
+            position = start
+            for i in range(children_count):
+                size = child_size + (i < extra)
+                node.children.append(
+                    self._build_subtree(index_file, keys, pointers, position, size, height - 1, node_size, False)
+                )
+                node.counts.append(size)
+                position += size
+                if i < children_count - 1:
+                    node.append(keys[position], pointers[position])
+                    position += 1
+        index_file.write(node.pointer, node.to_bytes())
+        return node.pointer
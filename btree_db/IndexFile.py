@@ -0,0 +1,55 @@
+import os
+from threading import Lock
+
+
+class IndexFile:
+
+    def __init__(self, file_name: str, page_size: int, truncate: bool = False):
+        self.file_name = file_name
+        self.page_size = page_size
+        if truncate:
+            open(self.file_name, 'wb').close()
+        self._file = open(self.file_name, 'r+b')
+        self._lock = Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def open(self):
+        if self.closed:
+            self._file = open(self.file_name, 'r+b')
+
+    def close(self):
+        self._file.close()
+
+    def flush(self, sync: bool = False):
+        with self._lock:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    @property
+    def page_count(self) -> int:
+        with self._lock:
+            self._file.seek(0, 2)
+            return self._file.tell() // self.page_size
+
+    def read(self, pointer: int) -> bytes:
+        with self._lock:
+            self._file.seek(pointer * self.page_size)
+            page = self._file.read(self.page_size)
+        if len(page) != self.page_size:
+            raise ValueError(f'Page {pointer} is out of bounds of {self.file_name}')
+        return page
+
+    def write(self, pointer: int, page: bytes):
+        if len(page) > self.page_size:
+            raise ValueError(f'Page {pointer} does not fit into {self.page_size} bytes')
+        with self._lock:
+            self._file.seek(pointer * self.page_size)
+            self._file.write(page.ljust(self.page_size, b'\0'))
+
+    def free(self, pointer: int):
+        if pointer < self.page_count:
+            self.write(pointer, b'')
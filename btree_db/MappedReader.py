@@ -0,0 +1,66 @@
+import mmap
+import os
+from threading import Lock
+from typing import Iterator
+
+from .Compressor import Compressor
+from .Converter import Converter
+
+
+class MappedReader:
+
+    def __init__(self, file_name: str, compressor: Compressor | None = None):
+        self.file_name = file_name + '.btree'
+        self.compressor = compressor or Compressor(None)
+        self._file = open(self.file_name, 'rb')
+        self._map = None
+        self._view = memoryview(b'')
+        self._lock = Lock()
+        self.remap()
+
+    @property
+    def size(self) -> int:
+        return len(self._view)
+
+    def remap(self):
+        with self._lock:
+            size = os.fstat(self._file.fileno()).st_size
+            if size > len(self._view):
+                self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._map)
+
+    def _mapped(self, end: int) -> memoryview:
+        view = self._view
+        if end > len(view):
+            self.remap()
+            view = self._view
+            if end > len(view):
+                raise ValueError(f'Record at {end} is beyond the end of {self.file_name}')
+        return view
+
+    def view(self, pointer: int) -> memoryview:
+        view = self._mapped(pointer + 4)
+        header = Converter.to_int(view[pointer:pointer + 4])
+        end = pointer + 4 + Compressor.size(header)
+        return self.compressor.unpack(header, self._mapped(end)[pointer + 4:end])
+
+    def read(self, pointer: int) -> str:
+        return str(self.view(pointer), 'utf-8')
+
+    def record_size(self, pointer: int) -> int:
+        return 4 + Compressor.size(Converter.to_int(self._mapped(pointer + 4)[pointer:pointer + 4]))
+
+    def records(self) -> Iterator[memoryview]:
+        self.remap()
+        view = self._view
+        pointer = 0
+        while pointer < len(view):
+            header = Converter.to_int(view[pointer:pointer + 4])
+            end = pointer + 4 + Compressor.size(header)
+            yield self.compressor.unpack(header, view[pointer + 4:end])
+            pointer = end
+
+    def close(self):
+        self._view = memoryview(b'')
+        self._map = None
+        self._file.close()
@@ -0,0 +1,87 @@
+import logging
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterable
+
+from .Histogram import Histogram
+
+
+class Metrics:
+
+    COUNTERS = (
+        'node_cache_hits',
+        'node_cache_misses',
+        'value_cache_hits',
+        'value_cache_misses',
+        'node_loads',
+        'node_saves',
+        'splits',
+        'merges',
+        'redistributions',
+        'index_bytes_read',
+        'index_bytes_written',
+        'data_bytes_read',
+        'data_bytes_written'
+    )
+    LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+    COMPARISON_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        with self._lock:
+            self.histograms = {}
+
+    def observe(self, name: str, value: float, buckets: Iterable[float] = LATENCY_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram(buckets))
+        histogram.observe(value)
+
+    @staticmethod
+    def timed(operation: str) -> Callable:
+        def decorator(method: Callable) -> Callable:
+            @wraps(method)
+            def wrapper(self, *args, **kwargs):
+                metrics = self.metrics
+                if not metrics.enabled:
+                    return method(self, *args, **kwargs)
+                start = perf_counter()
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    metrics.observe(f'{operation}_seconds', perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> dict:
+        return {
+            'counters': {name: getattr(self, name) for name in self.COUNTERS},
+            'histograms': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+        }
+
+    def to_prometheus(self, prefix: str = 'btree') -> str:
+        lines = []
+        for name in self.COUNTERS:
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total {getattr(self, name)}')
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append(f'# TYPE {prefix}_{name} histogram')
+            for bound, total in histogram.cumulative():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_{name}_bucket{{le="{le}"}} {total}')
+            lines.append(f'{prefix}_{name}_sum {histogram.sum}')
+            lines.append(f'{prefix}_{name}_count {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def log(self, logger: logging.Logger, level: int = logging.INFO):
+        snapshot = self.snapshot()
+        counters = ' '.join(f'{name}={value}' for name, value in snapshot['counters'].items())
+        logger.log(level, 'btree_db metrics %s', counters, extra={'metrics': snapshot})
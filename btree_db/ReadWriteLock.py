@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from threading import Condition
+
+
+class ReadWriteLock:
+
+    def __init__(self):
+        self._condition = Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def _acquired(self, shared: bool):
+        pass
+
+    def _releasing(self, shared: bool):
+        pass
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            if self._readers == 0:
+                self._acquired(shared=True)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._releasing(shared=True)
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            try:
+                self._acquired(shared=False)
+            except BaseException:
+                self._condition.notify_all()
+                raise
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                try:
+                    self._releasing(shared=False)
+                finally:
+                    self._writer = False
+                    self._condition.notify_all()
@@ -0,0 +1,28 @@
+from contextlib import contextmanager
+from queue import Queue
+
+from .BTreeIO import BTreeIO
+from .Compressor import Compressor
+
+
+class ReaderPool:
+
+    def __init__(self, db_name: str, size: int, compressor: Compressor | None = None):
+        self.size = size
+        self._readers = Queue()
+        for _ in range(size):
+            reader = BTreeIO(db_name, compressor=compressor)
+            reader.open('r')
+            self._readers.put(reader)
+
+    @contextmanager
+    def acquire(self) -> BTreeIO:
+        reader = self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put(reader)
+
+    def close(self):
+        for _ in range(self.size):
+            self._readers.get().close()
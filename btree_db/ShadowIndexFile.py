@@ -0,0 +1,155 @@
+from array import array
+from threading import RLock
+
+from .Converter import Converter
+from .IndexFile import IndexFile
+
+
+class ShadowIndexFile(IndexFile):
+
+    UNMAPPED = 2 ** 32 - 1
+
+    def __init__(self, file_name: str, page_size: int, truncate: bool = False, table_pointer: int | None = None):
+        super().__init__(file_name, page_size, truncate)
+        self.table_pointer = table_pointer
+        self.chunk_size = page_size // 4
+        self._table = array(Converter.uint32_typecode)
+        self._chunks = array(Converter.uint32_typecode)
+        self._directory = []
+        self._dirty_chunks = set()
+        self._fresh = set()
+        self._retired = []
+        self._pending = []
+        self._free = []
+        self._end = IndexFile.page_count.fget(self)
+        self._state_lock = RLock()
+        if table_pointer is not None:
+            self._load_table()
+
+    def _read_page(self, physical: int) -> bytes:
+        return IndexFile.read(self, physical)
+
+    def _write_page(self, physical: int, page: bytes):
+        IndexFile.write(self, physical, page)
+
+    def _load_table(self):
+        physical = self.table_pointer
+        while physical != self.UNMAPPED:
+            words = Converter.to_uint32_array(self._read_page(physical))
+            self._directory.append(physical)
+            self._chunks.extend(words[2:2 + words[1]])
+            physical = words[0]
+        for chunk in self._chunks:
+            self._table.extend(Converter.to_uint32_array(self._read_page(chunk)))
+
+    @property
+    def page_count(self) -> int:
+        return len(self._table)
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._dirty_chunks or self._fresh or self._retired)
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self._end += 1
+        return self._end - 1
+
+    def _extend(self, pointer: int):
+        if pointer >= len(self._table):
+            chunks = pointer // self.chunk_size + 1
+            self._table.extend([self.UNMAPPED] * (chunks * self.chunk_size - len(self._table)))
+
+    def physical(self, pointer: int) -> int:
+        return self._table[pointer] if pointer < len(self._table) else self.UNMAPPED
+
+    def read(self, pointer: int) -> bytes:
+        physical = self.physical(pointer)
+        if physical == self.UNMAPPED:
+            raise ValueError(f'Page {pointer} is out of bounds of {self.file_name}')
+        return self._read_page(physical)
+
+    def write(self, pointer: int, page: bytes):
+        with self._state_lock:
+            self._extend(pointer)
+            physical = self._table[pointer]
+            if physical not in self._fresh:
+                if physical != self.UNMAPPED:
+                    self._retired.append(physical)
+                physical = self._allocate()
+                self._fresh.add(physical)
+                self._table[pointer] = physical
+                self._dirty_chunks.add(pointer // self.chunk_size)
+            self._write_page(physical, page)
+
+    def free(self, pointer: int):
+        with self._state_lock:
+            if pointer >= len(self._table) or self._table[pointer] == self.UNMAPPED:
+                return
+            physical = self._table[pointer]
+            if physical in self._fresh:
+                self._fresh.discard(physical)
+                self._free.append(physical)
+            else:
+                self._retired.append(physical)
+            self._table[pointer] = self.UNMAPPED
+            self._dirty_chunks.add(pointer // self.chunk_size)
+
+    def commit(self, sequence: int) -> int:
+        with self._state_lock:
+            for chunk in sorted(self._dirty_chunks):
+                if chunk >= len(self._chunks):
+                    self._chunks.extend([self.UNMAPPED] * (chunk + 1 - len(self._chunks)))
+                if self._chunks[chunk] != self.UNMAPPED:
+                    self._retired.append(self._chunks[chunk])
+                physical = self._allocate()
+                self._write_page(physical, Converter.from_uint32_array(
+                    self._table[chunk * self.chunk_size:(chunk + 1) * self.chunk_size]
+                ))
+                self._chunks[chunk] = physical
+            self._retired.extend(self._directory)
+            self._directory = []
+            physical = self.UNMAPPED
+            per_page = self.chunk_size - 2
+            for start in reversed(range(0, max(len(self._chunks), 1), per_page)):
+                entries = self._chunks[start:start + per_page]
+                page = Converter.from_uint32_array([physical, len(entries)] + list(entries))
+                physical = self._allocate()
+                self._write_page(physical, page)
+                self._directory.insert(0, physical)
+            self.table_pointer = physical
+            self._pending.append((sequence, self._retired))
+            self._retired = []
+            self._fresh.clear()
+            self._dirty_chunks.clear()
+            return self.table_pointer
+
+    def reclaim(self, oldest: int | None):
+        with self._state_lock:
+            pending = []
+            for sequence, pages in self._pending:
+                if oldest is None or sequence <= oldest:
+                    self._free.extend(pages)
+                else:
+                    pending.append((sequence, pages))
+            self._pending = pending
+
+    def reclaim_orphans(self):
+        with self._state_lock:
+            used = set(self._table)
+            used.update(self._chunks)
+            used.update(self._directory)
+            used.update(self._fresh)
+            self._free = [physical for physical in range(self._end) if physical not in used]
+
+    def adopt(self, other: 'ShadowIndexFile'):
+        with self._state_lock:
+            used = set(self._table)
+            used.update(self._chunks)
+            used.update(self._directory)
+            self._free.extend(physical for physical in other._free if physical not in used)
+            self._pending.extend(
+                (sequence, [physical for physical in pages if physical not in used])
+                for sequence, pages in other._pending
+            )
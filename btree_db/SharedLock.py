@@ -0,0 +1,37 @@
+from typing import Callable
+
+from .FileLock import FileLock
+from .ReadWriteLock import ReadWriteLock
+
+
+class SharedLock(ReadWriteLock):
+
+    def __init__(self, file_name: str, refresh: Callable[[bool], None], publish: Callable[[], None]):
+        super().__init__()
+        self._file_lock = FileLock(file_name)
+        self._refresh = refresh
+        self._publish = publish
+
+    def _acquired(self, shared: bool):
+        self._file_lock.acquire(shared)
+        try:
+            self._refresh(shared)
+        except BaseException:
+            self._file_lock.release()
+            raise
+
+    def _releasing(self, shared: bool):
+        try:
+            if not shared:
+                self._publish()
+        finally:
+            self._file_lock.release()
+
+    def exclusive(self) -> FileLock:
+        return self._file_lock
+
+    def open(self):
+        self._file_lock.open()
+
+    def close(self):
+        self._file_lock.close()
@@ -0,0 +1,102 @@
+from threading import Lock
+from typing import Iterator, Self
+
+from .BTreeIO import BTreeIO
+from .Cursor import Cursor
+from .Index import Index
+from .ReadWriteLock import ReadWriteLock
+
+
+class Snapshot:
+
+    def __init__(self, owner: Index, index: Index, io: BTreeIO):
+        self.sequence = index.sequence
+        self._owner = owner
+        self._index = index
+        self._io = io
+        self._lock = ReadWriteLock()
+        self._io_lock = Lock()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        with self._lock.write():
+            if self._closed:
+                return
+            self._closed = True
+            self._owner.release(self._index)
+            self._io.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError('Snapshot is closed')
+
+    def _read_value(self, pointer: int) -> str:
+        with self._io_lock:
+            return self._io.read(pointer)
+
+    def __len__(self) -> int:
+        return self._index.key_count
+
+    def rank(self, key: int) -> int:
+        with self._lock.read():
+            self._check_open()
+            return self._index.rank(key)
+
+    def nth(self, index: int) -> int:
+        with self._lock.read():
+            self._check_open()
+            return self._index.nth(index)[0]
+
+    def count_range(self, lo: int = None, hi: int = None) -> int:
+        with self._lock.read():
+            self._check_open()
+            return self._index.count_range(lo, hi)
+
+    def __getitem__(self, key: int) -> str:
+        with self._lock.read():
+            self._check_open()
+            db_pointer = self._index.search(key)[0]
+            if db_pointer is None:
+                raise KeyError(key)
+            return self._read_value(db_pointer)
+
+    def __contains__(self, key: int) -> bool:
+        with self._lock.read():
+            self._check_open()
+            return self._index.search(key)[0] is not None
+
+    def get(self, key: int, default: str | None = None) -> str | None:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def range(self, lo: int = None, hi: int = None, reverse: bool = False) -> Cursor:
+        self._check_open()
+        return Cursor(self._index, self._lock, lo, hi, reverse, self._read_value)
+
+    def items(self, start: int = None, reverse: bool = False) -> Cursor:
+        if reverse:
+            return self.range(hi=None if start is None else start + 1, reverse=True)
+        return self.range(lo=start)
+
+    def keys(self, start: int = None, reverse: bool = False) -> Iterator[int]:
+        self._check_open()
+        if reverse:
+            cursor = Cursor(self._index, self._lock, hi=None if start is None else start + 1, reverse=True)
+        else:
+            cursor = Cursor(self._index, self._lock, lo=start)
+        return (key for key, _ in cursor)
+
+    def traverse(self) -> list[tuple[int, str]]:
+        return list(self.range())
@@ -0,0 +1,93 @@
+import os
+from typing import Self
+
+from .Converter import Converter
+
+
+class Superblock:
+
+    MAGIC = b'BTDB'
+    VERSION = 2
+    FIELDS = (
+        't',
+        'root_pointer',
+        'max_pointer',
+        'key_count',
+        'data_size',
+        'live_size',
+        'index_generation',
+        'data_generation',
+        'engine',
+        'sequence',
+        'table_pointer',
+        'node_format'
+    )
+    UNKNOWN = 2 ** 32 - 1
+
+    def __init__(
+            self,
+            file_name: str,
+            t: int,
+            root_pointer: int = 0,
+            max_pointer: int = 0,
+            key_count: int = 0,
+            data_size: int | None = None,
+            live_size: int | None = None,
+            index_generation: int = 0,
+            data_generation: int = 0,
+            engine: int = 0,
+            sequence: int = 0,
+            table_pointer: int | None = None,
+            node_format: int = 0
+    ):
+        self.file_name = file_name
+        self.t = t
+        self.root_pointer = root_pointer
+        self.max_pointer = max_pointer
+        self.key_count = key_count
+        self.data_size = data_size
+        self.live_size = live_size
+        self.index_generation = index_generation
+        self.data_generation = data_generation
+        self.engine = engine
+        self.sequence = sequence
+        self.table_pointer = table_pointer
+        self.node_format = node_format
+
+    @classmethod
+    def load(cls, file_name: str) -> Self:
+        with open(file_name, 'rb') as f:
+            return cls.from_bytes(file_name, f.read())
+
+    @classmethod
+    def from_bytes(cls, file_name: str, data: bytes) -> Self:
+        if data[:len(cls.MAGIC)] != cls.MAGIC or len(data) < len(cls.MAGIC) + 8:
+            raise ValueError(f'{file_name} is not a superblock file')
+        data = data[len(cls.MAGIC):]
+        version = Converter.to_int(data[:4])
+        if version == 1:
+            values = Converter.to_uint32_array(data[4:20])
+        elif version == cls.VERSION:
+            count = Converter.to_int(data[4:8])
+            values = Converter.to_uint32_array(data[8:8 + 4 * count])
+        else:
+            raise ValueError(f'Unsupported index format version {version}')
+        fields = {
+            name: None if value == cls.UNKNOWN else value
+            for name, value in zip(cls.FIELDS, values)
+        }
+        return cls(file_name, **fields)
+
+    def to_bytes(self) -> bytes:
+        values = [getattr(self, name) for name in self.FIELDS]
+        return self.MAGIC + Converter.from_uint32_array(
+            [self.VERSION, len(values)] + [self.UNKNOWN if value is None else value for value in values]
+        )
+
+    def save(self):
+        temp_file_name = self.file_name + '.tmp'
+        with open(temp_file_name, 'wb') as f:
+            f.write(self.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file_name, self.file_name)
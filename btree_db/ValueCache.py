@@ -0,0 +1,77 @@
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+from .Metrics import Metrics
+
+
+class ValueCache:
+
+    def __init__(self, max_bytes: int, metrics: Metrics | None = None):
+        if max_bytes < 1:
+            raise ValueError('max_bytes must be 1 or greater')
+        self.max_bytes = max_bytes
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, pointer: int) -> bool:
+        return pointer in self._values
+
+    @property
+    def hit_rate(self) -> float | None:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'entries': len(self._values),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes
+        }
+
+    def get(self, pointer: int) -> str | None:
+        with self._lock:
+            value = self._values.get(pointer)
+            if value is not None:
+                self._values.move_to_end(pointer)
+        if value is None:
+            self.misses += 1
+            self.metrics.value_cache_misses += 1
+        else:
+            self.hits += 1
+            self.metrics.value_cache_hits += 1
+        return value
+
+    def put(self, pointer: int, value: str):
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if pointer in self._values:
+                return
+            self._values[pointer] = value
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._values.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+
+    def discard(self, pointer: int):
+        with self._lock:
+            value = self._values.pop(pointer, None)
+            if value is not None:
+                self.size -= sys.getsizeof(value)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self.size = 0
@@ -0,0 +1,129 @@
+import os
+import zlib
+from threading import Condition
+
+from .Converter import Converter
+
+
+class WriteAheadLog:
+
+    PUT = 1
+    DELETE = 2
+    PAGE = 3
+    CHECKPOINT = 4
+    HEADER_SIZE = 13
+
+    def __init__(self, db_name: str, truncate: bool = False):
+        self.file_name = f'{db_name}.bwal'
+        if truncate:
+            open(self.file_name, 'wb').close()
+        self._file = open(self.file_name, 'ab')
+        self._condition = Condition()
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+
+    @property
+    def size(self) -> int:
+        with self._condition:
+            self._file.flush()
+            return os.fstat(self._file.fileno()).st_size
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def open(self):
+        with self._condition:
+            if self._file.closed:
+                self._file = open(self.file_name, 'ab')
+
+    def close(self):
+        with self._condition:
+            self._file.close()
+
+    @classmethod
+    def _encode(cls, op: int, key: int, value: bytes) -> bytes:
+        body = Converter.to_bytes(len(value)) + bytes([op]) + Converter.to_bytes(key) + value
+        return Converter.to_bytes(zlib.crc32(body)) + body
+
+    def append(self, op: int, key: int, value: bytes = b'') -> int:
+        record = self._encode(op, key, value)
+        with self._condition:
+            self._file.write(record)
+            self._written += len(record)
+            return self._written
+
+    def commit(self, lsn: int):
+        with self._condition:
+            while self._synced < lsn:
+                if self._syncing:
+                    self._condition.wait()
+                    continue
+                self._syncing = True
+                self._file.flush()
+                target = self._written
+                self._condition.release()
+                try:
+                    os.fsync(self._file.fileno())
+                finally:
+                    self._condition.acquire()
+                    self._syncing = False
+                    self._condition.notify_all()
+                self._synced = max(self._synced, target)
+
+    def publish(self, pages: list[tuple[int, bytes]], superblock: bytes) -> int:
+        for pointer, page in pages:
+            self.append(self.PAGE, pointer, page)
+        lsn = self.append(self.CHECKPOINT, 0, superblock)
+        with self._condition:
+            self._file.flush()
+        return lsn
+
+    def checkpoint(self, pages: list[tuple[int, bytes]], superblock: bytes):
+        self.commit(self.publish(pages, superblock))
+
+    def truncate(self, size: int = 0):
+        with self._condition:
+            self._file.flush()
+            self._file.truncate(size)
+            self._file.seek(size)
+            self._synced = max(self._synced, self._written)
+            self._condition.notify_all()
+
+    def _read_records(self, position: int) -> list[tuple[int, int, bytes]]:
+        with open(self.file_name, 'rb') as f:
+            f.seek(position)
+            data = f.read()
+        records = []
+        position = 0
+        while position + self.HEADER_SIZE <= len(data):
+            crc = Converter.to_int(data[position:position + 4])
+            length = Converter.to_int(data[position + 4:position + 8])
+            end = position + self.HEADER_SIZE + length
+            if end > len(data) or zlib.crc32(data[position + 4:end]) != crc:
+                break
+            op = data[position + 8]
+            key = Converter.to_int(data[position + 9:position + 13])
+            records.append((op, key, data[position + self.HEADER_SIZE:end]))
+            position = end
+        return records
+
+    def recover(
+            self,
+            position: int = 0
+    ) -> tuple[list[tuple[int, bytes]], bytes | None, list[tuple[int, int, bytes]], int]:
+        pages, superblock, operations = [], None, []
+        pending_pages = []
+        published = position
+        for op, key, value in self._read_records(position):
+            position += self.HEADER_SIZE + len(value)
+            if op == self.PAGE:
+                pending_pages.append((key, value))
+            elif op == self.CHECKPOINT:
+                pages.extend(pending_pages)
+                superblock, operations, published = value, [], position
+                pending_pages = []
+            else:
+                operations.append((op, key, value))
+        return pages, superblock, operations, published
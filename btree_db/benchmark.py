@@ -0,0 +1,160 @@
+import os
+import platform
+import random
+import time
+from array import array
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Sequence
+
+from .BTreeDB import BTreeDB
+
+WORKLOADS = ('sequential_insert', 'random_insert', 'read', 'update', 'mixed', 'traverse', 'delete')
+
+
+def _value(key: int, size: int) -> str:
+    return str(key).rjust(size, 'v')
+
+
+def _percentile(latencies: list[int], fraction: float) -> int:
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+
+def _measure(db: BTreeDB, workload: str, operations: Sequence, run: Callable[[Any], Any]) -> dict[str, Any]:
+    node_loads, node_saves = db.metrics.node_loads, db.metrics.node_saves
+    latencies = array('Q')
+    clock = time.perf_counter_ns
+    start = clock()
+    for operation in operations:
+        began = clock()
+        run(operation)
+        latencies.append(clock() - began)
+    elapsed = clock() - start
+    db.checkpoint()
+    latencies = sorted(latencies)
+    return {
+        'workload': workload,
+        'operations': len(latencies),
+        'seconds': elapsed / 1e9,
+        'ops_per_sec': len(latencies) / (elapsed / 1e9) if elapsed else None,
+        'p50_us': _percentile(latencies, 0.5) / 1e3 if latencies else None,
+        'p99_us': _percentile(latencies, 0.99) / 1e3 if latencies else None,
+        'node_reads': db.metrics.node_loads - node_loads,
+        'node_writes': db.metrics.node_saves - node_saves,
+        'index_bytes': db.index_size,
+        'data_bytes': db.data_size
+    }
+
+
+def run_workloads(
+        name: str,
+        keys: int,
+        t: int,
+        workloads: Sequence[str] = WORKLOADS,
+        operations: int = 100000,
+        value_size: int = 32,
+        read_ratio: float = 0.9,
+        seed: int = 0,
+        **options
+) -> list[dict[str, Any]]:
+    for workload in workloads:
+        if workload not in WORKLOADS:
+            raise ValueError(f"Workload can only be one of {', '.join(WORKLOADS)}")
+    rng = random.Random(seed)
+    count = min(operations, keys)
+    results = []
+    db = None
+    loaded = False
+
+    def put(key: int):
+        db[key] = _value(key, value_size)
+
+    def update(key: int):
+        db[key] = _value(key + 1, value_size)
+
+    def mixed(operation: tuple[bool, int]):
+        is_read, key = operation
+        if is_read:
+            db[key]
+        else:
+            put(key)
+
+    try:
+        for workload in workloads:
+            if workload in ('sequential_insert', 'random_insert') or not loaded:
+                if db is not None:
+                    db.close()
+                db = BTreeDB(name, t, truncate=True, **options).open('w')
+                order = list(range(keys))
+                if workload != 'sequential_insert':
+                    rng.shuffle(order)
+                loaded = True
+                if workload in ('sequential_insert', 'random_insert'):
+                    results.append(_measure(db, workload, order, put))
+                    continue
+                for key in order:
+                    put(key)
+                db.checkpoint()
+            if workload == 'read':
+                plan = [rng.randrange(keys) for _ in range(count)]
+                results.append(_measure(db, workload, plan, db.__getitem__))
+            elif workload == 'update':
+                plan = [rng.randrange(keys) for _ in range(count)]
+                results.append(_measure(db, workload, plan, update))
+            elif workload == 'mixed':
+                plan = [(rng.random() < read_ratio, rng.randrange(keys)) for _ in range(count)]
+                results.append(_measure(db, workload, plan, mixed))
+            elif workload == 'traverse':
+                result = _measure(db, workload, [None], lambda _: db.traverse())
+                result['keys_per_sec'] = keys / result['seconds'] if result['seconds'] else None
+                results.append(result)
+            elif workload == 'delete':
+                order = list(range(keys))
+                rng.shuffle(order)
+                results.append(_measure(db, workload, order, db.pop))
+                loaded = False
+    finally:
+        if db is not None:
+            db.close()
+    for result in results:
+        result.update(keys=keys, t=t)
+    return results
+
+
+def run(
+        keys: Sequence[int] = (1000, 10000, 100000),
+        ts: Sequence[int] = (50,),
+        workloads: Sequence[str] = WORKLOADS,
+        operations: int = 100000,
+        value_size: int = 32,
+        read_ratio: float = 0.9,
+        seed: int = 0,
+        directory: str | None = None,
+        progress: Callable[[str], None] | None = None,
+        **options
+) -> dict[str, Any]:
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'keys': list(keys),
+            't': list(ts),
+            'workloads': list(workloads),
+            'operations': operations,
+            'value_size': value_size,
+            'read_ratio': read_ratio,
+            'seed': seed,
+            **options
+        },
+        'results': []
+    }
+    with TemporaryDirectory(dir=directory) as temp_dir:
+        name = os.path.join(temp_dir, 'bench')
+        for key_count in keys:
+            for t in ts:
+                if progress is not None:
+                    progress(f'{key_count} keys, t={t}')
+                report['results'].extend(run_workloads(
+                    name, key_count, t, workloads, operations, value_size, read_ratio, seed, **options
+                ))
+    return report
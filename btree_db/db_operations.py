@@ -1,50 +1,327 @@
+import asyncio
+import atexit
+import logging
+import os
+from itertools import islice
+from threading import Lock
+
+from .AsyncBTreeDB import AsyncBTreeDB
 from .BTreeDB import BTreeDB
+from .index_migration import migrate_index_dir
 
+name = 'db'
 t = 50
+engine = 'btree'
+readers = 0
+use_mmap = True
+vacuum_ratio = 0.5
+shared = False
+shadow = True
+collect_metrics = True
+compression = True
+value_cache_size = 64 * 2 ** 20
+memory_budget = 32 * 2 ** 20
+async_workers = 4
+
+logger = logging.getLogger(__name__)
+
+_db = None
+_db_pid = None
+_async_db = None
+_db_lock = Lock()
 
 
 def init_db(truncate=False):
     if not truncate:
-        try:
-            return BTreeDB('db', t, truncate=False)
-        except (ValueError, FileNotFoundError):
-            pass
-    return BTreeDB('db', t, truncate=True)
+        if os.path.isdir(f'{name}_index') and not os.path.exists(f'{name}.bmeta'):
+            migrate_index_dir(name)
+            os.replace(f'{name}_index', f'{name}_index.migrated')
+        if os.path.exists(f'{name}.bmeta') or os.path.exists(f'{name}.bindex'):
+            return BTreeDB(
+                name, t, truncate=False, engine=engine, readers=readers, mmap=use_mmap, wal=True,
+                vacuum_ratio=vacuum_ratio, shared=shared, metrics=collect_metrics, compression=compression,
+                value_cache=value_cache_size, memory_budget=memory_budget
+            )
+    return BTreeDB(
+        name, t, truncate=True, engine=engine, readers=readers, mmap=use_mmap, wal=True,
+        vacuum_ratio=vacuum_ratio, shared=shared, shadow=shadow, metrics=collect_metrics,
+        compression=compression, value_cache=value_cache_size, memory_budget=memory_budget
+    )
+
+
+def connect(truncate=False) -> BTreeDB:
+    global _db, _db_pid
+    with _db_lock:
+        if truncate or _db is None or _db_pid != os.getpid():
+            if _db is not None and _db_pid == os.getpid():
+                _db.close()
+            _db = init_db(truncate).open('w')
+            _db_pid = os.getpid()
+        return _db
+
+
+def _connect_async() -> AsyncBTreeDB:
+    global _async_db
+    btree = connect()
+    with _db_lock:
+        if _async_db is None or _async_db.db is not btree:
+            if _async_db is not None:
+                _async_db.shutdown(wait=False)
+            _async_db = AsyncBTreeDB(btree, async_workers)
+        return _async_db
+
+
+async def aconnect() -> AsyncBTreeDB:
+    async_db = _async_db
+    if async_db is not None and async_db.db is _db and _db_pid == os.getpid():
+        return async_db
+    return await asyncio.to_thread(_connect_async)
+
+
+def disconnect():
+    global _db, _db_pid, _async_db
+    with _db_lock:
+        if _async_db is not None:
+            _async_db.shutdown(wait=False)
+        if _db is not None and _db_pid == os.getpid():
+            _db.close()
+        _db = _db_pid = _async_db = None
+
+
+atexit.register(disconnect)
 
 
 def insert_or_update(data):
-    btree = init_db(False)
+    btree = connect()
 
     key, value = int(data['key']), data['value']
 
-    with btree.open('w'):
-        btree[key] = value
+    btree[key] = value
+
+
+def insert(data):
+    btree = connect()
+
+    key, value = int(data['key']), data['value']
+
+    return btree.insert_if_absent(key, value)
+
+
+def update(data):
+    btree = connect()
+
+    key, value = int(data['key']), data['value']
+
+    return btree.update_if_present(key, value)
 
 
 def delete(data):
-    btree = init_db(False)
+    btree = connect()
 
     key = int(data['key'])
 
-    with btree.open('w'):
-        btree.pop(key)
+    return btree.pop(key)
 
 
 def read(data):
-    btree = init_db(False)
+    btree = connect()
+
+    key = int(data['key'])
+
+    return btree[key]
+
+
+def exists(data):
+    btree = connect()
 
     key = int(data['key'])
 
-    with btree.open('r'):
-        return btree[key]
+    return key in btree
+
+
+def read_many(keys):
+    btree = connect()
+
+    return btree.get_many(int(key) for key in keys)
+
+
+def insert_or_update_many(items):
+    btree = connect()
+
+    return btree.put_many((int(item['key']), item['value']) for item in items)
+
+
+def delete_many(keys):
+    btree = connect()
+
+    return btree.delete_many(int(key) for key in keys)
 
 
 def read_all():
-    btree = init_db(False)
+    btree = connect()
 
-    with btree.open('r'):
+    if not btree.shadow:
         return btree.traverse()
+    with btree.snapshot() as snapshot:
+        return snapshot.traverse()
+
+
+def read_page(after=None, limit=50, page=None, before=None):
+    btree = connect()
+
+    if page is not None or before is not None:
+        offset = (page - 1) * limit if page is not None else max(0, btree.rank(before) - limit)
+        try:
+            start = btree.nth(offset)
+        except IndexError:
+            return [], None, None, offset, len(btree)
+    else:
+        start = None if after is None else after + 1
+        offset = 0 if start is None else btree.rank(start)
+    rows = list(islice(btree.items(start), limit + 1))
+    next_after = rows[limit - 1][0] if len(rows) > limit else None
+    prev_before = rows[0][0] if rows and offset else None
+    return rows[:limit], next_after, prev_before, offset, len(btree)
+
+
+def iter_all():
+    btree = connect()
+
+    return btree.items()
+
+
+def bulk_load(items, presorted=False, fill_factor=1.0):
+    btree = connect()
+
+    return btree.bulk_load(items, presorted, fill_factor)
+
+
+def vacuum(fill_factor=1.0):
+    btree = connect()
+
+    return btree.vacuum(fill_factor)
+
+
+def train_dictionary(samples=1000):
+    btree = connect()
+
+    return btree.train_dictionary(samples)
 
 
 def delete_all():
-    init_db(True)
+    btree = connect()
+
+    btree.clear()
+
+
+def metrics_text():
+    btree = connect()
+
+    return btree.metrics.to_prometheus()
+
+
+def log_metrics(level=logging.INFO):
+    btree = connect()
+
+    btree.metrics.log(logger, level)
+
+
+async def ainsert_or_update(data):
+    btree = await aconnect()
+
+    key, value = int(data['key']), data['value']
+
+    await btree.put(key, value)
+
+
+async def ainsert(data):
+    btree = await aconnect()
+
+    key, value = int(data['key']), data['value']
+
+    return await btree.insert_if_absent(key, value)
+
+
+async def aupdate(data):
+    btree = await aconnect()
+
+    key, value = int(data['key']), data['value']
+
+    return await btree.update_if_present(key, value)
+
+
+async def adelete(data):
+    btree = await aconnect()
+
+    key = int(data['key'])
+
+    return await btree.delete(key)
+
+
+async def aread(data):
+    btree = await aconnect()
+
+    key = int(data['key'])
+
+    value = await btree.get(key)
+    if value is None:
+        raise KeyError(key)
+    return value
+
+
+async def aread_many(keys):
+    btree = await aconnect()
+
+    return await btree.get_many(int(key) for key in keys)
+
+
+async def ainsert_or_update_many(items):
+    btree = await aconnect()
+
+    return await btree.put_many((int(item['key']), item['value']) for item in items)
+
+
+async def adelete_many(keys):
+    btree = await aconnect()
+
+    return await btree.delete_many(int(key) for key in keys)
+
+
+async def aread_page(after=None, limit=50, page=None, before=None):
+    btree = await aconnect()
+
+    if page is not None or before is not None:
+        offset = (page - 1) * limit if page is not None else max(0, await btree.rank(before) - limit)
+        try:
+            start = await btree.nth(offset)
+        except IndexError:
+            return [], None, None, offset, await btree.count()
+    else:
+        start = None if after is None else after + 1
+        offset = 0 if start is None else await btree.rank(start)
+    rows = []
+    async for item in btree.items(start, chunk_size=limit + 1):
+        rows.append(item)
+        if len(rows) > limit:
+            break
+    next_after = rows[limit - 1][0] if len(rows) > limit else None
+    prev_before = rows[0][0] if rows and offset else None
+    return rows[:limit], next_after, prev_before, offset, await btree.count()
+
+
+async def aiter_all(chunk_size=256):
+    btree = await aconnect()
+
+    return btree.items(chunk_size=chunk_size)
+
+
+async def adelete_all():
+    btree = await aconnect()
+
+    await btree.clear()
+
+
+async def ametrics_text():
+    btree = await aconnect()
+
+    return btree.db.metrics.to_prometheus()
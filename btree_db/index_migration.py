@@ -0,0 +1,71 @@
+import pickle
+from array import array
+from os import listdir, path
+from shutil import rmtree
+
+from .BTreeNode import BTreeNode
+from .Converter import Converter
+from .IndexFile import IndexFile
+from .Superblock import Superblock
+
+
+class _LegacyNode:
+    pass
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+
+    def find_class(self, module: str, name: str):
+        if module == 'btree_db.BTreeNode' and name == 'BTreeNode':
+            return _LegacyNode
+        return super().find_class(module, name)
+
+
+def _load_legacy_node(file_name: str) -> _LegacyNode:
+    with open(file_name, 'rb') as f:
+        return _LegacyUnpickler(f).load()
+
+
+def _subtree_total(legacy_node: _LegacyNode, by_pointer: dict[int, _LegacyNode], totals: dict[int, int]) -> int:
+    total = len(legacy_node.keys)
+    for child in legacy_node.children:
+        total += _subtree_total(by_pointer[child], by_pointer, totals)
+    totals[legacy_node.pointer] = total
+    return total
+
+
+def migrate_index_dir(db_name: str, remove: bool = False, force: bool = False) -> int:
+    if not force and path.exists(f'{db_name}.bmeta'):
+        raise ValueError(f'{db_name}.bmeta already exists, refusing to overwrite the current index')
+    dir_name = f'{db_name}_index/'
+    file_names = [dir_name + name for name in listdir(dir_name) if name.endswith('.bnode')]
+    if not file_names:
+        raise ValueError(f'{dir_name} contains no index nodes')
+
+    legacy_nodes = [_load_legacy_node(file_name) for file_name in file_names]
+    t = legacy_nodes[0].t
+    if any(legacy_node.t != t for legacy_node in legacy_nodes):
+        raise ValueError(f'Nodes in {dir_name} were created with different t values')
+
+    by_pointer = {legacy_node.pointer: legacy_node for legacy_node in legacy_nodes}
+    root_pointer = next(legacy_node.pointer for legacy_node in legacy_nodes if legacy_node.parent is None)
+    totals = {}
+    key_count = _subtree_total(by_pointer[root_pointer], by_pointer, totals)
+
+    index_file = IndexFile(f'{db_name}.bindex', BTreeNode.page_size(t), truncate=True)
+    for legacy_node in sorted(legacy_nodes, key=lambda legacy_node: legacy_node.pointer):
+        node = BTreeNode(legacy_node.pointer, t)
+        node.keys = array(Converter.uint32_typecode, legacy_node.keys)
+        node.pointers = array(Converter.uint32_typecode, legacy_node.pointers)
+        node.children = array(Converter.uint32_typecode, legacy_node.children)
+        node.counts = array(Converter.uint32_typecode, (totals[child] for child in legacy_node.children))
+        index_file.write(node.pointer, node.to_bytes())
+    index_file.flush(sync=True)
+    index_file.close()
+
+    max_pointer = max(legacy_node.pointer for legacy_node in legacy_nodes)
+    Superblock(f'{db_name}.bmeta', t, root_pointer, max_pointer, key_count, node_format=BTreeNode.FORMAT).save()
+
+    if remove:
+        rmtree(path.normpath(dir_name))
+    return len(legacy_nodes)
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from btree_db.AsyncBTreeDB import AsyncBTreeDB
+from btree_db.BTreeDB import BTreeDB
+
+
+class AsyncBTreeDBTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        db = BTreeDB(os.path.join(directory.name, 'db'), 3).open('w')
+        self.db = AsyncBTreeDB(db, batch_size=50)
+        await self.db.put_many((key, str(key)) for key in range(200))
+
+    async def asyncTearDown(self):
+        await self.db.close()
+
+    async def test_get_coalescing(self):
+        with mock.patch.object(self.db.db, 'get_many', wraps=self.db.db.get_many) as get_many:
+            keys = [key % 120 for key in range(150)] + [500]
+            values = await asyncio.gather(*(self.db.get(key, 'missing') for key in keys))
+        self.assertEqual([str(key) if key < 200 else 'missing' for key in keys], values)
+        self.assertEqual(3, get_many.call_count)
+        requested = [key for call in get_many.call_args_list for key in call.args[0]]
+        self.assertEqual(sorted(set(keys)), sorted(requested))
+        self.assertEqual({}, self.db._reads)
+
+    async def test_write_during_get(self):
+        released = threading.Event()
+        get_many = self.db.db.get_many
+
+        def slow_get_many(keys):
+            values = get_many(keys)
+            released.wait()
+            return values
+
+        with mock.patch.object(self.db.db, 'get_many', side_effect=slow_get_many):
+            stale = asyncio.ensure_future(self.db.get(7))
+            await asyncio.sleep(0.05)
+            await self.db.put(7, 'new')
+            fresh = asyncio.ensure_future(self.db.get(7))
+            await asyncio.sleep(0.05)
+            released.set()
+            self.assertEqual(['7', 'new'], await asyncio.gather(stale, fresh))
+        self.assertEqual('new', await self.db.get(7))
+
+    async def test_errors_reach_every_waiter(self):
+        with mock.patch.object(self.db.db, 'get_many', side_effect=OSError('read failed')):
+            gets = [self.db.get(1), self.db.get(1), self.db.get(2)]
+            results = await asyncio.gather(*gets, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, OSError) for result in results))
+        self.assertEqual('1', await self.db.get(1))
+
+    async def test_cursor(self):
+        items = [item async for item in self.db.items(150, chunk_size=7)]
+        self.assertEqual([(key, str(key)) for key in range(150, 200)], items)
+        keys = [key async for key in self.db.keys(3, reverse=True)]
+        self.assertEqual([3, 2, 1, 0], keys)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import random
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class BatchTest(unittest.TestCase):
+
+    ENGINES = ('btree', 'bplus')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def _check(self, db: BTreeDB, expected: dict[int, str]):
+        ordered = sorted(expected.items())
+        self.assertEqual(ordered, db.traverse())
+        self.assertEqual(len(ordered), len(db))
+        for i in range(0, len(ordered), 17):
+            self.assertEqual(ordered[i][0], db.nth(i))
+            self.assertEqual(i, db.rank(ordered[i][0]))
+
+    def test_random_batches(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine), BTreeDB(self.name, 2, engine=engine).open('w') as db:
+                rng = random.Random(engine)
+                expected = {}
+                for _ in range(30):
+                    keys = rng.sample(range(3000), rng.randrange(1, 300))
+                    items = [(key, f'{key} {rng.random()}') for key in keys]
+                    self.assertEqual([key not in expected for key, _ in items], db.put_many(items))
+                    expected.update(items)
+                    self._check(db, expected)
+                    keys = rng.sample(range(3000), rng.randrange(1, 300))
+                    self.assertEqual([key in expected for key in keys], db.delete_many(keys))
+                    for key in keys:
+                        expected.pop(key, None)
+                    self._check(db, expected)
+                    keys = rng.sample(range(3000), 100)
+                    self.assertEqual([expected.get(key) for key in keys], db.get_many(keys))
+
+    def test_sequential_batches(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine), BTreeDB(self.name, 2, engine=engine).open('w') as db:
+                db.put_many((key, str(key)) for key in range(2000))
+                self._check(db, {key: str(key) for key in range(2000)})
+                db.delete_many(range(100, 1900))
+                self._check(db, {key: str(key) for key in (*range(100), *range(1900, 2000))})
+                db.delete_many(range(2000))
+                self._check(db, {})
+
+    def test_duplicate_keys(self):
+        with BTreeDB(self.name, 2).open('w') as db:
+            self.assertEqual([True, False, True], db.put_many([(1, 'a'), (1, 'b'), (2, 'c')]))
+            self.assertEqual(['b', 'c', 'b'], db.get_many([1, 2, 1]))
+            self.assertEqual([False, True, False, True], db.delete_many([3, 1, 1, 2]))
+            self.assertEqual([], db.traverse())
+
+    def test_reopen_after_batches(self):
+        for wal in (False, True):
+            with self.subTest(wal=wal):
+                with BTreeDB(self.name, 3, wal=wal).open('w') as db:
+                    db.put_many((key, str(key)) for key in range(500))
+                    db.delete_many(range(0, 500, 3))
+                with BTreeDB(self.name, 3, truncate=False, wal=wal).open('r') as db:
+                    self.assertEqual([(key, str(key)) for key in range(500) if key % 3], db.traverse())
+
+
+if __name__ == '__main__':
+    unittest.main()
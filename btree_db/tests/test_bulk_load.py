@@ -0,0 +1,75 @@
+import os
+import random
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class BulkLoadTest(unittest.TestCase):
+
+    ENGINES = ('btree', 'bplus')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def _open(self, engine: str, truncate: bool = True) -> BTreeDB:
+        return BTreeDB(self.name, 3, truncate, engine=engine).open('w')
+
+    def test_presorted_and_unsorted(self):
+        for engine in self.ENGINES:
+            for presorted in (True, False):
+                with self.subTest(engine=engine, presorted=presorted), self._open(engine) as db:
+                    keys = list(range(0, 3000, 2))
+                    if not presorted:
+                        random.Random(engine).shuffle(keys)
+                    self.assertEqual(len(keys), db.bulk_load(((key, str(key)) for key in keys), presorted))
+                    expected = [(key, str(key)) for key in range(0, 3000, 2)]
+                    self.assertEqual(expected, db.traverse())
+                    self.assertEqual(len(expected), len(db))
+                    self.assertEqual(750, db.rank(1500))
+                    db[1] = 'one'
+                    db.pop(0)
+                    self.assertEqual([(1, 'one'), (2, '2')], list(db.range(0, 3)))
+            with self.subTest(engine=engine, reopen=True), self._open(engine, truncate=False) as db:
+                self.assertEqual(1500, len(db))
+                self.assertEqual('one', db[1])
+
+    def test_out_of_order_presorted_input(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine), self._open(engine) as db:
+                with self.assertRaises(ValueError):
+                    db.bulk_load([(1, 'a'), (3, 'b'), (2, 'c')], presorted=True)
+                self.assertEqual([], db.traverse())
+
+    def test_merges_into_existing_records(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine), self._open(engine) as db:
+                for key in range(0, 400, 3):
+                    db[key] = 'old'
+                db.bulk_load([(key, 'new') for key in range(0, 400, 2)] + [(10, 'last')])
+                expected = {key: 'old' for key in range(0, 400, 3)}
+                expected.update((key, 'new') for key in range(0, 400, 2))
+                expected[10] = 'last'
+                self.assertEqual(sorted(expected.items()), db.traverse())
+                self.assertGreater(db.dead_size, 0)
+
+    def test_fill_factor(self):
+        for engine in self.ENGINES:
+            sizes = []
+            for fill_factor in (1.0, 0.5):
+                with self.subTest(engine=engine, fill_factor=fill_factor), self._open(engine) as db:
+                    db.bulk_load(((key, str(key)) for key in range(5000)), True, fill_factor)
+                    self.assertEqual([(key, str(key)) for key in range(5000)], db.traverse())
+                    sizes.append(db.index_size)
+            self.assertGreater(sizes[1], sizes[0] * 1.5)
+            with self.subTest(engine=engine), self._open(engine) as db:
+                for fill_factor in (0, 1.5):
+                    with self.assertRaises(ValueError):
+                        db.bulk_load([(1, 'a')], fill_factor=fill_factor)
+
+
+if __name__ == '__main__':
+    unittest.main()
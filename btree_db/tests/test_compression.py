@@ -0,0 +1,106 @@
+import os
+import random
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+from btree_db.Compressor import Compressor
+from btree_db.Converter import Converter
+
+
+def _value(key: int) -> str:
+    return f'{{"id": {key}, "name": "customer {key}", "status": "active", "tags": ["a", "b"]}} ' * (1 + key % 5)
+
+
+class CompressionTest(unittest.TestCase):
+
+    OPTIONS = ({}, {'mmap': True}, {'readers': 2}, {'engine': 'bplus', 'wal': True})
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def test_round_trip(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options):
+                expected = {key: _value(key) for key in range(300)}
+                expected.update({key: str(key) for key in range(300, 320)})
+                with BTreeDB(self.name, 3, compression=True, **options).open('w') as db:
+                    for key, value in expected.items():
+                        db[key] = value
+                    self.assertEqual(sorted(expected.items()), db.traverse())
+                    raw_size = sum(4 + len(value.encode()) for value in expected.values())
+                    self.assertLess(db.data_size, raw_size // 2)
+                    self.assertEqual(_value(7), db[7])
+                with BTreeDB(self.name, 3, truncate=False, compression=True, **options).open('w') as db:
+                    self.assertEqual(sorted(expected.items()), db.traverse())
+                    db.put_many((key, 'updated ' + _value(key)) for key in range(0, 300, 2))
+                    db.vacuum()
+                    self.assertEqual('updated ' + _value(4), db[4])
+                    self.assertEqual(_value(5), db[5])
+
+    def test_reads_uncompressed_records(self):
+        with BTreeDB(self.name, 3).open('w') as db:
+            for key in range(50):
+                db[key] = _value(key)
+        with BTreeDB(self.name, 3, truncate=False, compression=True).open('w') as db:
+            for key in range(50, 100):
+                db[key] = _value(key)
+            self.assertEqual([(key, _value(key)) for key in range(100)], db.traverse())
+
+    def test_train_dictionary(self):
+        rng = random.Random(0)
+        before = {key: _value(rng.randrange(10 ** 6)) for key in range(200)}
+        after = {key: _value(rng.randrange(10 ** 6)) for key in range(200, 400)}
+        with BTreeDB(self.name, 3, compression=True).open('w') as db:
+            for key, value in before.items():
+                db[key] = value
+            size = db.data_size
+            self.assertGreater(db.train_dictionary(samples=100, size=4096), 0)
+            for key, value in after.items():
+                db[key] = value
+            self.assertLess(db.data_size - size, size)
+            self.assertEqual(sorted({**before, **after}.items()), db.traverse())
+            self.assertGreater(db.train_dictionary(samples=50, size=1024), 0)
+            db[400] = _value(400)
+        with BTreeDB(self.name, 3, truncate=False, compression=True, mmap=True).open('r') as db:
+            self.assertEqual(before[10], db[10])
+            self.assertEqual(after[210], db[210])
+            self.assertEqual(_value(400), db[400])
+        with BTreeDB(self.name, 3, truncate=False, compression=True).open('w') as db:
+            db.vacuum()
+            self.assertEqual(sorted({**before, **after, 400: _value(400)}.items()), db.traverse())
+
+    def test_missing_dictionary(self):
+        with BTreeDB(self.name, 3, compression=True).open('w') as db:
+            for key in range(100):
+                db[key] = _value(key)
+            db.train_dictionary()
+            db[104] = _value(104)
+        os.remove(self.name + '.bdict')
+        with BTreeDB(self.name, 3, truncate=False, compression=True).open('r') as db:
+            self.assertEqual(_value(1), db[1])
+            with self.assertRaises(ValueError):
+                db[104]
+
+    def test_train_requires_write_mode(self):
+        BTreeDB(self.name, 3, compression=True).open('w').close()
+        with BTreeDB(self.name, 3, truncate=False, compression=True).open('r') as db:
+            with self.assertRaises(ValueError):
+                db.train_dictionary()
+
+    def test_pack(self):
+        compressor = Compressor()
+        for data in (b'', b'short', os.urandom(1000), b'abc' * 1000):
+            with self.subTest(size=len(data)):
+                packed = compressor.pack(data)
+                header = Converter.to_int(packed[:4])
+                self.assertEqual(len(packed) - 4, Compressor.size(header))
+                self.assertEqual(data, bytes(compressor.unpack(header, memoryview(packed[4:]))))
+                self.assertEqual(len(data) >= 128 and data[:3] == b'abc', bool(header & Compressor.FLAG))
+        self.assertEqual(b'x' * 500, Compressor(None).pack(b'x' * 500)[4:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from btree_db.BTreeDB import BTreeDB
+from btree_db.CuckooFilter import CuckooFilter
+from btree_db.Index import Index
+
+
+class FilterPersistenceTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+        with BTreeDB(self.name, 3).open('w') as db:
+            for key in range(0, 2000, 2):
+                db[key] = str(key)
+
+    def _open(self, mode: str = 'r', **options) -> BTreeDB:
+        return BTreeDB(self.name, 3, truncate=False, **options).open(mode)
+
+    def _check(self, db: BTreeDB):
+        self.assertIn(10, db)
+        self.assertNotIn(11, db)
+        self.assertEqual([None, '1998'], db.get_many([1999, 1998]))
+
+    def test_loaded_on_first_lookup(self):
+        with mock.patch.object(CuckooFilter, 'load', wraps=CuckooFilter.load) as load, \
+                mock.patch.object(Index, '_rebuild_filter') as rebuild, self._open() as db:
+            self.assertEqual(0, load.call_count)
+            self._check(db)
+            self.assertEqual(1, load.call_count)
+            rebuild.assert_not_called()
+
+    def test_saved_after_update_only_session(self):
+        with self._open('w') as db:
+            for key in range(0, 2000, 4):
+                db[key] = 'updated'
+        with mock.patch.object(Index, '_rebuild_filter') as rebuild, self._open() as db:
+            self._check(db)
+            self.assertEqual('updated', db[8])
+            rebuild.assert_not_called()
+
+    def test_rebuilt_and_saved_on_tag_mismatch(self):
+        for mode, damage in (('r', b'\xff'), ('w', b'\xff'), ('r', None)):
+            with self.subTest(mode=mode, damage=damage):
+                if damage is None:
+                    os.remove(self.name + '.bfilter')
+                else:
+                    with open(self.name + '.bfilter', 'r+b') as f:
+                        f.seek(len(CuckooFilter.MAGIC) + 4)
+                        f.write(damage)
+                with mock.patch.object(Index, '_rebuild_filter', autospec=True,
+                                       side_effect=Index._rebuild_filter) as rebuild, self._open(mode) as db:
+                    self._check(db)
+                    self.assertEqual(1, rebuild.call_count)
+                with mock.patch.object(Index, '_rebuild_filter') as rebuild, self._open() as db:
+                    self._check(db)
+                    rebuild.assert_not_called()
+
+    def test_rebuilt_on_corrupt_buckets(self):
+        with open(self.name + '.bfilter', 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\xff')
+        with self._open('w', wal=True) as db:
+            self._check(db)
+            db[11] = 'new'
+        with mock.patch.object(Index, '_rebuild_filter') as rebuild, self._open() as db:
+            self.assertIn(11, db)
+            self.assertNotIn(13, db)
+            rebuild.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import random
+import tempfile
+import unittest
+from bisect import bisect_left
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class IndexTest(unittest.TestCase):
+
+    ENGINES = ('btree', 'bplus')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def _open(self, engine: str) -> BTreeDB:
+        return BTreeDB(self.name, 2, engine=engine, metrics=True).open('w')
+
+    def _check_node(
+            self, index, pointer: int, lo: int | None, hi: int | None, depths: set[int], depth: int
+    ) -> int:
+        node = index.read(pointer)
+        keys = list(node.keys)
+        self.assertEqual(sorted(set(keys)), keys)
+        self.assertFalse(node.is_full)
+        if pointer != index.root_pointer:
+            self.assertFalse(node.is_min)
+        if keys:
+            self.assertTrue(lo is None or keys[0] >= lo)
+            self.assertTrue(hi is None or keys[-1] < hi)
+        if node.is_leaf:
+            depths.add(depth)
+            return len(node.pointers)
+        self.assertEqual(len(keys) + 1, len(node.children))
+        bounds = [lo, *keys, hi]
+        total = len(node.pointers)
+        for i, child in enumerate(node.children):
+            count = self._check_node(index, child, bounds[i], bounds[i + 1], depths, depth + 1)
+            if node.counts:
+                self.assertEqual(count, node.counts[i])
+            total += count
+        return total
+
+    def _check(self, db: BTreeDB, expected: dict[int, str]):
+        depths = set()
+        total = self._check_node(db._index, db._index.root_pointer, None, None, depths, 0)
+        self.assertEqual(len(expected), total)
+        self.assertEqual(1, len(depths))
+        self.assertEqual(len(expected), len(db))
+        self.assertEqual(sorted(expected.items()), db.traverse())
+
+    def test_split_merge_redistribute(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine), self._open(engine) as db:
+                rng = random.Random(engine)
+                expected = {}
+                keys = list(range(0, 1000, 3))
+                rng.shuffle(keys)
+                for i, key in enumerate(keys):
+                    db[key] = f'value {key}'
+                    expected[key] = f'value {key}'
+                    if i % 37 == 0:
+                        self._check(db, expected)
+                self._check(db, expected)
+                self.assertGreater(db.metrics.splits, 0)
+
+                rng.shuffle(keys)
+                for i, key in enumerate(keys):
+                    self.assertEqual(expected.pop(key), db.pop(key))
+                    if i % 37 == 0:
+                        self._check(db, expected)
+                self._check(db, expected)
+                self.assertGreater(db.metrics.merges, 0)
+                self.assertGreater(db.metrics.redistributions, 0)
+
+    def test_ascending_and_descending_inserts(self):
+        for engine in self.ENGINES:
+            for keys in (range(500), range(499, -1, -1)):
+                with self.subTest(engine=engine, step=keys.step), self._open(engine) as db:
+                    for key in keys:
+                        db[key] = str(key)
+                    self._check(db, {key: str(key) for key in keys})
+
+    def test_leaf_chain(self):
+        with self._open('bplus') as db:
+            rng = random.Random(1)
+            keys = rng.sample(range(2000), 600)
+            for key in keys:
+                db[key] = str(key)
+            for key in keys[:250]:
+                db.pop(key)
+            ordered = sorted(keys[250:])
+            leaf = db._index._leaf_for(None)
+            chained = list(leaf.keys)
+            while leaf.next is not None:
+                leaf = db._index.read(leaf.next)
+                chained.extend(leaf.keys)
+            self.assertEqual(ordered, chained)
+            for _ in range(50):
+                lo, hi = sorted(rng.randrange(2000) for _ in range(2))
+                expected = [key for key in ordered if lo <= key < hi]
+                self.assertEqual(expected, [key for key, _ in db.range(lo, hi)])
+                self.assertEqual(expected[::-1], [key for key, _ in db.range(lo, hi, reverse=True)])
+
+    def test_rank_nth_count_range(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine), self._open(engine) as db:
+                rng = random.Random(engine)
+                keys = rng.sample(range(5000), 700)
+                for key in keys:
+                    db[key] = str(key)
+                for key in keys[:200]:
+                    db.pop(key)
+                ordered = sorted(keys[200:])
+                for i, key in enumerate(ordered):
+                    self.assertEqual(key, db.nth(i))
+                    self.assertEqual(key, db.nth(i - len(ordered)))
+                for index in (len(ordered), -len(ordered) - 1):
+                    with self.assertRaises(IndexError):
+                        db.nth(index)
+                for key in range(0, 5002, 7):
+                    self.assertEqual(bisect_left(ordered, key), db.rank(key))
+                for _ in range(200):
+                    lo, hi = sorted(rng.randrange(5000) for _ in range(2))
+                    count = bisect_left(ordered, hi) - bisect_left(ordered, lo)
+                    self.assertEqual(count, db.count_range(lo, hi))
+                    self.assertEqual(bisect_left(ordered, hi), db.count_range(hi=hi))
+                    self.assertEqual(len(ordered) - bisect_left(ordered, lo), db.count_range(lo))
+                self.assertEqual(0, db.count_range(10, 5))
+
+    def test_memory_budget(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine):
+                node_size = BTreeDB.ENGINES[engine].node_class.memory_size(2)
+                db = BTreeDB(self.name, 2, engine=engine, memory_budget=8 * node_size).open('w')
+                with db:
+                    for key in range(500):
+                        db[key] = str(key)
+                    self.assertEqual(8, db._index._pool.max_nodes)
+                    self.assertEqual([(key, str(key)) for key in range(500)], db.traverse())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from btree_db import db_operations
+from btree_db.BTreeDB import BTreeDB
+from btree_db.Converter import Converter
+from btree_db.index_migration import migrate_index_dir
+
+
+class LegacyNode:
+    pass
+
+
+LegacyNode.__module__ = 'btree_db.BTreeNode'
+LegacyNode.__name__ = LegacyNode.__qualname__ = 'BTreeNode'
+
+
+class IndexMigrationTest(unittest.TestCase):
+
+    TREE = {0: ([4, 8], [1, 2, 3], None), 1: ([1, 2, 3], [], 0), 2: ([5, 6, 7], [], 0), 3: ([9, 10], [], 0)}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+        self.expected = []
+        pointers = {}
+        with open(self.name + '.btree', 'wb') as f:
+            for key in sorted(key for keys, _, _ in self.TREE.values() for key in keys):
+                value = f'value {key}'
+                pointers[key] = f.tell()
+                f.write(Converter.to_bytes(len(value.encode())) + value.encode())
+                self.expected.append((key, value))
+        os.mkdir(self.name + '_index')
+        with mock.patch('btree_db.BTreeNode.BTreeNode', LegacyNode):
+            for pointer, (keys, children, parent) in self.TREE.items():
+                node = LegacyNode()
+                node.pointer, node.t, node.parent = pointer, 2, parent
+                node.keys, node.children = keys, children
+                node.pointers = [pointers[key] for key in keys]
+                with open(f'{self.name}_index/{pointer}.bnode', 'wb') as f:
+                    pickle.dump(node, f)
+
+    def test_migrate(self):
+        self.assertEqual(len(self.TREE), migrate_index_dir(self.name))
+        with BTreeDB(self.name, 2, truncate=False).open('w') as db:
+            self.assertEqual(self.expected, db.traverse())
+            self.assertEqual(len(self.expected), len(db))
+            self.assertEqual(4, db.rank(5))
+            self.assertEqual(9, db.nth(-2))
+            for key in range(11, 40):
+                db[key] = str(key)
+            db.pop(5)
+        with BTreeDB(self.name, 2, truncate=False).open('r') as db:
+            self.assertEqual(len(self.expected) + 28, len(db))
+            self.assertEqual('value 6', db[6])
+            self.assertNotIn(5, db)
+
+    def test_refuses_existing_superblock(self):
+        migrate_index_dir(self.name)
+        with self.assertRaises(ValueError):
+            migrate_index_dir(self.name)
+        self.assertEqual(len(self.TREE), migrate_index_dir(self.name, remove=True, force=True))
+        self.assertFalse(os.path.exists(self.name + '_index'))
+
+    def test_rejects_empty_directory(self):
+        for file_name in os.listdir(self.name + '_index'):
+            os.remove(os.path.join(self.name + '_index', file_name))
+        with self.assertRaises(ValueError):
+            migrate_index_dir(self.name)
+
+    def test_init_db_migrates_once(self):
+        self.addCleanup(setattr, db_operations, 'name', db_operations.name)
+        db_operations.name = self.name
+        with db_operations.init_db().open('r') as db:
+            self.assertEqual(self.expected, db.traverse())
+        self.assertFalse(os.path.exists(self.name + '_index'))
+        self.assertTrue(os.path.isdir(self.name + '_index.migrated'))
+
+
+if __name__ == '__main__':
+    unittest.main()
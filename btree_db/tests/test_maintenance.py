@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class MaintenanceTest(unittest.TestCase):
+
+    OPTIONS = [
+        {'engine': engine, 'wal': wal, 'mmap': mmap}
+        for engine in ('btree', 'bplus') for wal in (False, True) for mmap in (False, True)
+    ]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def test_vacuum_with_open_cursor(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options), BTreeDB(self.name, 2, **options).open('w') as db:
+                for key in range(300):
+                    db[key] = f'old {key}'
+                for key in range(0, 300, 2):
+                    db[key] = f'new {key}'
+                for key in range(0, 300, 3):
+                    db.pop(key)
+                expected = [(key, db[key]) for key in range(300) if key % 3]
+                forward = db.items()
+                backward = db.items(reverse=True)
+                head = [next(forward) for _ in range(50)]
+                tail = [next(backward) for _ in range(50)]
+                self.assertGreater(db.vacuum(), 0)
+                self.assertEqual(0, db.dead_size)
+                self.assertEqual(expected, head + list(forward))
+                self.assertEqual(expected[::-1], tail + list(backward))
+                self.assertEqual(expected, db.traverse())
+
+    def test_clear_with_open_cursor(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options), BTreeDB(self.name, 2, **options).open('w') as db:
+                for key in range(300):
+                    db[key] = str(key)
+                cursor = db.items()
+                keys = db.keys(start=100)
+                self.assertEqual([(0, '0'), (1, '1')], [next(cursor), next(cursor)])
+                self.assertEqual(100, next(keys))
+                db.clear()
+                self.assertEqual([], list(cursor))
+                self.assertEqual([], list(keys))
+                db[5] = 'after clear'
+                self.assertEqual([(5, 'after clear')], list(db.items()))
+
+    def test_maintenance_requires_write_mode(self):
+        BTreeDB(self.name, 2).open('w').close()
+        with BTreeDB(self.name, 2, truncate=False).open('r') as db:
+            with self.assertRaises(ValueError):
+                db.vacuum()
+            with self.assertRaises(ValueError):
+                db.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
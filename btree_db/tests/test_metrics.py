@@ -0,0 +1,74 @@
+import os
+import re
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+from btree_db.Metrics import Metrics
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{le="(\+Inf|[0-9.e+-]+)"\})? ([0-9.e+-]+)$')
+
+
+class PrometheusTest(unittest.TestCase):
+
+    def _parse(self, text: str) -> tuple[dict[str, str], list[tuple[str, str | None, float]]]:
+        self.assertTrue(text.endswith('\n'))
+        types = {}
+        samples = []
+        for line in text.splitlines():
+            if line.startswith('#'):
+                _, keyword, name, metric_type = line.split(' ')
+                self.assertEqual('TYPE', keyword)
+                self.assertNotIn(name, types)
+                types[name] = metric_type
+                continue
+            match = SAMPLE.match(line)
+            self.assertIsNotNone(match, line)
+            name, le, value = match.groups()
+            family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in types else name
+            self.assertIn(family, types, line)
+            samples.append((name, le, float(value)))
+        return types, samples
+
+    def test_text_format(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with BTreeDB(os.path.join(directory, 'db'), 2, metrics=True).open('w') as db:
+                for key in range(100):
+                    db[key] = str(key)
+                for key in range(0, 100, 2):
+                    db.pop(key)
+                db.get_many(range(10))
+                types, samples = self._parse(db.metrics.to_prometheus())
+                values = {(name, le): value for name, le, value in samples}
+                for name in Metrics.COUNTERS:
+                    self.assertEqual('counter', types[f'btree_{name}_total'])
+                    self.assertEqual(getattr(db.metrics, name), values[f'btree_{name}_total', None])
+                self.assertGreater(values['btree_splits_total', None], 0)
+                self.assertIn('histogram', types.values())
+                for family, metric_type in types.items():
+                    if metric_type != 'histogram':
+                        continue
+                    buckets = [(le, value) for name, le, value in samples if name == f'{family}_bucket']
+                    counts = [value for _, value in buckets]
+                    self.assertEqual(sorted(counts), counts)
+                    self.assertEqual('+Inf', buckets[-1][0])
+                    self.assertEqual(values[f'{family}_count', None], counts[-1])
+                    self.assertIn((f'{family}_sum', None), values)
+                self.assertEqual(50, values['btree_delete_seconds_count', None])
+
+    def test_prefix_and_reset(self):
+        metrics = Metrics(True)
+        metrics.splits = 3
+        metrics.observe('get_seconds', 2e-6)
+        types, samples = self._parse(metrics.to_prometheus('db'))
+        self.assertIn(('db_splits_total', None, 3.0), samples)
+        self.assertIn(('db_get_seconds_bucket', '5e-06', 1.0), samples)
+        self.assertIn(('db_get_seconds_bucket', '1e-06', 0.0), samples)
+        metrics.reset()
+        types, samples = self._parse(metrics.to_prometheus('db'))
+        self.assertIn(('db_splits_total', None, 0.0), samples)
+        self.assertNotIn('db_get_seconds', types)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class ReadersTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def test_concurrent_reads(self):
+        for options in ({'readers': 4}, {'mmap': True}, {'mmap': True, 'wal': True}):
+            with self.subTest(**options), BTreeDB(self.name, 3, **options).open('w') as db:
+                for key in range(500):
+                    db[key] = f'value {key}' * (key % 7)
+                with ThreadPoolExecutor(4) as executor:
+                    values = list(executor.map(db.__getitem__, range(500)))
+                self.assertEqual([f'value {key}' * (key % 7) for key in range(500)], values)
+                db[3] = 'updated'
+                db.vacuum()
+                self.assertEqual('updated', db[3])
+                self.assertEqual('value 499' * 2, db[499])
+
+    def test_rejects_readers_with_mmap(self):
+        with self.assertRaises(ValueError):
+            BTreeDB(self.name, 3, readers=4, mmap=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from multiprocessing import Barrier, Process
+
+from btree_db.BTreeDB import BTreeDB
+
+OPTIONS = {'shared': True, 'shadow': True, 'wal': True}
+
+
+def _write(name: str, engine: str, keys: range, barrier: Barrier):
+    with BTreeDB(name, 3, truncate=False, engine=engine, **OPTIONS).open('w') as db:
+        barrier.wait()
+        for key in keys:
+            db[key] = f'child {key}'
+        db.delete_many(range(keys.start, keys.stop, 10))
+
+
+class SharedTest(unittest.TestCase):
+
+    ENGINES = ('btree', 'bplus')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def test_two_writers(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine):
+                BTreeDB(self.name, 3, engine=engine, **OPTIONS).open('w').close()
+                barrier = Barrier(2)
+                child = Process(target=_write, args=(self.name, engine, range(1000, 1500), barrier))
+                child.start()
+                with BTreeDB(self.name, 3, truncate=False, engine=engine, **OPTIONS).open('w') as db:
+                    barrier.wait()
+                    for key in range(500):
+                        db[key] = f'parent {key}'
+                    child.join()
+                    self.assertEqual(0, child.exitcode)
+                    expected = [(key, f'parent {key}') for key in range(500)]
+                    expected += [(key, f'child {key}') for key in range(1000, 1500) if key % 10]
+                    self.assertEqual(expected, db.traverse())
+                    self.assertEqual(len(expected), len(db))
+                    self.assertIn(1001, db)
+                    self.assertNotIn(1010, db)
+                with BTreeDB(self.name, 3, truncate=False, engine=engine, **OPTIONS).open('r') as db:
+                    self.assertEqual(expected, db.traverse())
+
+    def test_reader_sees_writes(self):
+        BTreeDB(self.name, 3, **OPTIONS).open('w').close()
+        with BTreeDB(self.name, 3, truncate=False, **OPTIONS).open('r') as reader:
+            self.assertEqual(0, len(reader))
+            barrier = Barrier(2)
+            child = Process(target=_write, args=(self.name, 'btree', range(100), barrier))
+            child.start()
+            barrier.wait()
+            child.join()
+            self.assertEqual(0, child.exitcode)
+            self.assertEqual(90, len(reader))
+            self.assertEqual('child 99', reader[99])
+            self.assertNotIn(10, reader)
+            with reader.snapshot() as snapshot:
+                self.assertEqual(reader.traverse(), snapshot.traverse())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import random
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class SnapshotTest(unittest.TestCase):
+
+    ENGINES = ('btree', 'bplus')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def _churn(self, db: BTreeDB, rng: random.Random, expected: dict[int, str], rounds: int) -> list[int]:
+        sizes = []
+        for _ in range(rounds):
+            for i in range(200):
+                key = rng.randrange(300)
+                if rng.random() < 0.7:
+                    db[key] = expected[key] = f'{key}-{i}'
+                elif key in expected:
+                    self.assertEqual(expected.pop(key), db.pop(key))
+            db.checkpoint()
+            sizes.append(db.index_size)
+        return sizes
+
+    def test_snapshot_isolation(self):
+        for engine in self.ENGINES:
+            for wal in (False, True):
+                with self.subTest(engine=engine, wal=wal):
+                    with BTreeDB(self.name, 2, engine=engine, wal=wal, shadow=True).open('w') as db:
+                        rng = random.Random(engine)
+                        expected = {}
+                        self._churn(db, rng, expected, 1)
+                        frozen = dict(expected)
+                        with db.snapshot() as snapshot:
+                            self._churn(db, rng, expected, 5)
+                            self.assertEqual(sorted(frozen.items()), snapshot.traverse())
+                            self.assertEqual(len(frozen), len(snapshot))
+                            ordered = sorted(frozen)
+                            for key in range(300):
+                                self.assertEqual(frozen.get(key), snapshot.get(key))
+                                self.assertEqual(key in frozen, key in snapshot)
+                                self.assertEqual(sum(k < key for k in ordered), snapshot.rank(key))
+                            self.assertEqual(ordered[::-1], list(snapshot.keys(reverse=True)))
+                            self.assertEqual(ordered[len(ordered) // 2], snapshot.nth(len(ordered) // 2))
+                        self.assertEqual(sorted(expected.items()), db.traverse())
+                        with self.assertRaises(ValueError):
+                            snapshot.traverse()
+
+    def test_pages_reclaimed_after_release(self):
+        for engine in self.ENGINES:
+            with self.subTest(engine=engine):
+                with BTreeDB(self.name, 2, engine=engine, shadow=True).open('w') as db:
+                    rng = random.Random(engine)
+                    expected = {}
+                    steady = self._churn(db, rng, expected, 20)
+                    self.assertLessEqual(steady[-1], steady[4] * 1.2)
+
+                    snapshot = db.snapshot()
+                    frozen = snapshot.traverse()
+                    held = self._churn(db, rng, expected, 10)
+                    self.assertGreater(held[-1], steady[-1])
+                    self.assertEqual(frozen, snapshot.traverse())
+                    snapshot.close()
+
+                    released = self._churn(db, rng, expected, 10)
+                    self.assertEqual(released[0], released[-1])
+                    self.assertEqual(sorted(expected.items()), db.traverse())
+
+    def test_snapshot_requires_shadow_paging(self):
+        with BTreeDB(self.name, 2).open('w') as db:
+            with self.assertRaises(ValueError):
+                db.snapshot()
+
+
+if __name__ == '__main__':
+    unittest.main()
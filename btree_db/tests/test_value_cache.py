@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from btree_db.BTreeDB import BTreeDB
+
+
+class ValueCacheTest(unittest.TestCase):
+
+    OPTIONS = ({}, {'engine': 'bplus', 'wal': True, 'mmap': True})
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+
+    def _open(self, **options) -> BTreeDB:
+        db = BTreeDB(self.name, 3, value_cache=2 ** 20, **options).open('w')
+        self.addCleanup(db.close)
+        for key in range(200):
+            db[key] = f'old {key}'
+        self.assertEqual([f'old {key}' for key in range(200)], db.get_many(range(200)))
+        self.assertEqual(200, len(db.value_cache))
+        return db
+
+    def test_put(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options):
+                db = self._open(**options)
+                db[5] = 'new 5'
+                db.put_many([(6, 'new 6'), (300, 'new 300')])
+                self.assertEqual(198, len(db.value_cache))
+                self.assertEqual(['new 5', 'new 6', 'new 300', 'old 7'], db.get_many([5, 6, 300, 7]))
+                self.assertEqual('new 5', db[5])
+                db.close()
+
+    def test_pop(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options):
+                db = self._open(**options)
+                self.assertEqual('old 5', db.pop(5))
+                db.delete_many([6, 7])
+                self.assertEqual(197, len(db.value_cache))
+                self.assertEqual([None, None, 'old 8'], db.get_many([5, 6, 8]))
+                db[5] = 'new 5'
+                self.assertEqual('new 5', db[5])
+                db.close()
+
+    def test_vacuum(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options):
+                db = self._open(**options)
+                for key in range(0, 200, 2):
+                    db[key] = f'new {key}'
+                db.vacuum()
+                self.assertEqual(0, len(db.value_cache))
+                expected = [f'new {key}' if key % 2 == 0 else f'old {key}' for key in range(200)]
+                self.assertEqual(expected, db.get_many(range(200)))
+                self.assertEqual(expected, [db[key] for key in range(200)])
+                db.close()
+
+    def test_clear(self):
+        for options in self.OPTIONS:
+            with self.subTest(**options):
+                db = self._open(**options)
+                db.clear()
+                self.assertEqual(0, len(db.value_cache))
+                for key in range(200):
+                    db[key] = f'new {key}'
+                self.assertEqual([f'new {key}' for key in range(200)], db.get_many(range(200)))
+                db.close()
+
+    def test_shared_writer(self):
+        options = {'shared': True, 'shadow': True, 'wal': True}
+        BTreeDB(self.name, 3, **options).open('w').close()
+        reader = self._open(truncate=False, **options)
+        writer = BTreeDB(self.name, 3, truncate=False, **options).open('w')
+        self.addCleanup(writer.close)
+        writer[5] = 'new 5'
+        writer.pop(6)
+        self.assertEqual(['new 5', None, 'old 7'], reader.get_many([5, 6, 7]))
+        writer.vacuum()
+        writer[8] = 'new 8'
+        self.assertEqual(['new 5', None, 'new 8', 'old 9'], reader.get_many([5, 6, 8, 9]))
+        writer.clear()
+        writer[9] = 'new 9'
+        self.assertEqual([None, 'new 9'], reader.get_many([7, 9]))
+
+
+if __name__ == '__main__':
+    unittest.main()
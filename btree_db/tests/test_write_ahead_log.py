@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+from glob import escape, glob
+
+from btree_db.BTreeDB import BTreeDB
+from btree_db.WriteAheadLog import WriteAheadLog
+
+
+class WriteAheadLogTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'db')
+        self.crashed = os.path.join(directory.name, 'crashed')
+
+    def _crash(self):
+        for file_name in glob(escape(self.name) + '.*'):
+            shutil.copyfile(file_name, self.crashed + file_name[len(self.name):])
+
+    def test_recover_stops_at_torn_record(self):
+        wal = WriteAheadLog(self.name, truncate=True)
+        for key in range(10):
+            wal.append(WriteAheadLog.PUT, key, f'value {key}'.encode())
+        wal.close()
+        os.truncate(wal.file_name, os.path.getsize(wal.file_name) - 3)
+        wal = WriteAheadLog(self.name)
+        pages, superblock, operations, position = wal.recover()
+        wal.close()
+        self.assertEqual([], pages)
+        self.assertIsNone(superblock)
+        self.assertEqual([(WriteAheadLog.PUT, key, f'value {key}'.encode()) for key in range(9)], operations)
+        self.assertEqual(0, position)
+
+    def test_recover_keeps_pages_of_last_checkpoint(self):
+        wal = WriteAheadLog(self.name, truncate=True)
+        wal.checkpoint([(1, b'first')], b'superblock')
+        checkpointed = wal.size
+        wal.append(WriteAheadLog.DELETE, 7)
+        wal.publish([(2, b'second')], b'torn')
+        wal.close()
+        os.truncate(wal.file_name, os.path.getsize(wal.file_name) - 1)
+        wal = WriteAheadLog(self.name)
+        pages, superblock, operations, position = wal.recover()
+        wal.close()
+        self.assertEqual([(1, b'first')], pages)
+        self.assertEqual(b'superblock', superblock)
+        self.assertEqual([(WriteAheadLog.DELETE, 7, b'')], operations)
+        self.assertEqual(checkpointed, position)
+
+    def test_reopen_after_truncated_tail(self):
+        for engine in ('btree', 'bplus'):
+            with self.subTest(engine=engine):
+                db = BTreeDB(self.name, 2, engine=engine, wal=True).open('w')
+                for key in range(100):
+                    db[key] = str(key)
+                db.checkpoint()
+                for key in range(100, 200):
+                    db[key] = str(key)
+                db.pop(0)
+                self._crash()
+                db.close()
+                wal_file_name = self.crashed + '.bwal'
+                os.truncate(wal_file_name, os.path.getsize(wal_file_name) - 1)
+
+                db = BTreeDB(self.crashed, 2, truncate=False, wal=True).open('w')
+                self.assertEqual([(key, str(key)) for key in range(200)], db.traverse())
+                db[200] = 'after recovery'
+                db.close()
+                db = BTreeDB(self.crashed, 2, truncate=False, wal=True).open('r')
+                self.assertEqual(201, len(db))
+                self.assertEqual('after recovery', db[200])
+                db.close()
+
+    def test_reopen_ignores_garbage_tail(self):
+        db = BTreeDB(self.name, 2, wal=True).open('w')
+        for key in range(50):
+            db[key] = str(key)
+        self._crash()
+        db.close()
+        with open(self.crashed + '.bwal', 'ab') as f:
+            f.write(b'\x00\x01garbage')
+
+        db = BTreeDB(self.crashed, 2, truncate=False, wal=True).open('r')
+        self.assertEqual([(key, str(key)) for key in range(50)], db.traverse())
+        db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()